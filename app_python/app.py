@@ -1,12 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import Response
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from config import settings
+from exposition import MetricsExpositionDep
 from lifespan import lifespan
 from log_config import setup_json_logging
-from middleware import RequestLoggingMiddleware
-from routes import health_router, root_router, visits_router
+from middleware import ConditionalRequestMiddleware, RequestLoggingMiddleware
+from routes import debug_router, health_router, root_router, visits_router
 
 setup_json_logging()
 
@@ -18,21 +18,54 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(ConditionalRequestMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 
 for router in [root_router, health_router, visits_router]:
     app.include_router(router)
 
+# Debug endpoints only exist when they can be used; otherwise they would still
+# show up in `GET /` and the OpenAPI schema.
+if settings.debug or settings.debug_token:
+    app.include_router(debug_router)
+
 
 @app.get("/metrics", include_in_schema=False)
-async def metrics():
+async def metrics(request: Request, exposition: MetricsExpositionDep):
     """Prometheus metrics endpoint."""
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    rendered = await exposition.get(
+        request.headers.get("accept", ""),
+        request.headers.get("accept-encoding", ""),
+    )
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if rendered.gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return Response(
+        content=rendered.body, media_type=rendered.content_type, headers=headers
+    )
 
 
 if __name__ == "__main__":
+    import os
+    import tempfile
+
     import uvicorn
 
+    from metrics import prepare_multiprocess_dir
+
+    if settings.workers > 1:
+        # Workers are spawned fresh and inherit the environment, so their
+        # prometheus_client picks up multiprocess mode on import.
+        metrics_dir = settings.prometheus_multiproc_dir or tempfile.mkdtemp(
+            prefix="prometheus-"
+        )
+        prepare_multiprocess_dir(metrics_dir)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
     uvicorn.run(
-        "app:app", host=settings.host, port=settings.port, reload=settings.debug
+        "app:app",
+        host=settings.host,
+        port=settings.port,
+        reload=settings.debug,
+        workers=settings.workers,
     )
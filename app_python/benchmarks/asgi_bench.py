@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ENDPOINTS = ("/", "/health/", "/visits/", "/metrics")
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"asgi-bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def request(app, path: str) -> int:
+    """Send one GET through ``app`` and return the response status."""
+    status = 0
+    received = False
+
+    async def receive() -> dict:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(_scope(path), receive, send)
+    return status
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Run ``app``'s startup and shutdown through the ASGI lifespan protocol."""
+    messages: asyncio.Queue = asyncio.Queue()
+    replies: asyncio.Queue = asyncio.Queue()
+
+    async def step(event: str) -> None:
+        await messages.put({"type": f"lifespan.{event}"})
+        reply = await replies.get()
+        if reply["type"].endswith(".failed"):
+            raise RuntimeError(f"lifespan {event} failed: {reply.get('message')}")
+
+    task = asyncio.create_task(
+        app({"type": "lifespan", "asgi": {"version": "3.0"}}, messages.get, replies.put)
+    )
+    await step("startup")
+    try:
+        yield
+    finally:
+        await step("shutdown")
+        await task
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def _load(app, path: str, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    remaining = requests
+
+    async def client() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            status = await request(app, path)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                raise RuntimeError(f"GET {path} returned {status}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def _allocations(app, path: str, requests: int) -> dict:
+    """Traced memory per request, measured sequentially in a separate pass.
+
+    ``alloc_peak_bytes`` is the median tracemalloc peak above the starting
+    point while one request runs; ``retained_blocks_per_request`` is the
+    growth in live allocator blocks, which should stay near zero.
+    """
+    peaks = []
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await request(app, path)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    gc.collect()
+    peaks.sort()
+    return {
+        "alloc_peak_bytes": _percentile(peaks, 0.50),
+        "retained_blocks_per_request": round(
+            (sys.getallocatedblocks() - blocks) / requests, 2
+        ),
+    }
+
+
+async def run_benchmark(
+    app,
+    paths: tuple[str, ...] = ENDPOINTS,
+    requests: int = 2000,
+    concurrency: int = 50,
+    rounds: int = 3,
+    warmup: int = 200,
+    alloc_requests: int = 200,
+) -> dict:
+    """Benchmark ``paths`` on ``app``; each endpoint keeps its best round."""
+    results = {}
+    async with lifespan(app):
+        for path in paths:
+            for _ in range(warmup):
+                await request(app, path)
+            rounds_run = [
+                await _load(app, path, requests, concurrency) for _ in range(rounds)
+            ]
+            best = max(rounds_run, key=lambda r: r["rps"])
+            best.update(await _allocations(app, path, alloc_requests))
+            results[path] = best
+    return {
+        "python": platform.python_version(),
+        "requests": requests,
+        "concurrency": concurrency,
+        "endpoints": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return regressions: throughput down or p95 up by more than ``threshold``."""
+    regressions = []
+    for path, base in baseline["endpoints"].items():
+        current = results["endpoints"].get(path)
+        if current is None:
+            continue
+        if current["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{path}: {current['rps']} req/s vs {base['rps']}")
+        if current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{path}: p95 {current['p95_ms']} ms vs {base['p95_ms']} ms"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="In-process ASGI load benchmark for the service endpoints."
+    )
+    parser.add_argument("paths", nargs="*", default=list(ENDPOINTS))
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--alloc-requests", type=int, default=200)
+    parser.add_argument("--baseline", type=Path, help="fail on regressions vs this")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--save-baseline", type=Path, help="write results here")
+    args = parser.parse_args(argv)
+
+    # Keep benchmark state out of /data and access logs out of the report.
+    os.environ.setdefault("VISITS_FILE", str(Path(tempfile.mkdtemp()) / "visits"))
+    from app import app
+    from log_config import setup_json_logging
+
+    with open(os.devnull, "w") as devnull:
+        setup_json_logging(stream=devnull)
+        results = asyncio.run(
+            run_benchmark(
+                app,
+                tuple(args.paths),
+                requests=args.requests,
+                concurrency=args.concurrency,
+                rounds=args.rounds,
+                warmup=args.warmup,
+                alloc_requests=args.alloc_requests,
+            )
+        )
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.threshold
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import argparse
+import json
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+from routes.visits.service import build_counter, build_store  # noqa: E402
+
+BASELINE = "baseline"
+STORAGES = (BASELINE, "file", "log", "mmap", "sharded", "sqlite", "redis")
+DURABILITIES = ("fsync-every-write", "interval")
+# Every worker of a pod gets the same POD_NAME, so the benchmark's processes
+# share one shard name just like `WORKERS` > 1 does.
+SHARD = "bench"
+
+
+class BaselineCounter:
+    """The counter before write-behind: every hit re-reads the file, writes a
+    tmp file and renames it over the original, without fsync."""
+
+    def __init__(self, file_path: Path):
+        self._file_path = file_path
+        self._lock = threading.Lock()
+
+    def _read(self) -> int:
+        try:
+            return int(self._file_path.read_text().strip() or "0")
+        except FileNotFoundError:
+            return 0
+
+    def _write(self, value: int) -> None:
+        tmp = self._file_path.with_suffix(".tmp")
+        tmp.write_text(str(value))
+        tmp.replace(self._file_path)
+
+    def increment(self) -> int:
+        with self._lock:
+            value = self._read() + 1
+            self._write(value)
+            return value
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class CaseResult:
+    storage: str
+    durability: str
+    location: str
+    processes: int
+    threads: int
+    increments_per_s: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    expected: int
+    actual: int | None
+    error: str | None = None
+
+    @property
+    def lost(self) -> int | None:
+        return None if self.actual is None else self.expected - self.actual
+
+
+def _config(storage: str, durability: str, directory: Path, **extra):
+    return settings.model_copy(
+        update={
+            # The baseline writes the same plain-text file as `file` storage.
+            "visits_storage": "file" if storage == BASELINE else storage,
+            "visits_durability": durability,
+            "visits_file": str(directory / "visits"),
+            "pod_name": SHARD,
+            **extra,
+        }
+    )
+
+
+def _hammer(
+    storage: str, config, threads: int, ops: int, barrier
+) -> tuple[list[float], float, float]:
+    """Increment one counter from ``threads`` threads; return latencies and span."""
+    if storage == BASELINE:
+        counter = BaselineCounter(Path(config.visits_file))
+    else:
+        counter = build_counter(config)
+    latencies: list[list[float]] = [[] for _ in range(threads)]
+
+    def run(samples: list[float]) -> None:
+        for _ in range(ops):
+            started = time.perf_counter()
+            counter.increment()
+            samples.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=run, args=(s,)) for s in latencies]
+    barrier.wait()
+    started = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    counter.close()
+    finished = time.monotonic()
+    return [x for samples in latencies for x in samples], started, finished
+
+
+def _process_main(storage, config, threads, ops, barrier, results) -> None:
+    try:
+        results.put(_hammer(storage, config, threads, ops, barrier))
+    except Exception as exc:  # reported in the table, not fatal to the run
+        barrier.abort()
+        results.put(exc)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return round(sorted_values[index] * 1e6, 1)
+
+
+def run_case(
+    storage: str,
+    durability: str,
+    location: str,
+    directory: Path,
+    processes: int,
+    threads: int,
+    ops: int,
+    redis_url: str | None = None,
+) -> CaseResult:
+    case_dir = Path(tempfile.mkdtemp(prefix=f"{storage}-", dir=directory))
+    extra = {"visits_redis_key": f"visits-bench:{uuid.uuid4().hex}"}
+    if redis_url:
+        extra["visits_redis_url"] = redis_url
+    expected = processes * threads * ops
+    result = CaseResult(
+        storage, durability, location, processes, threads, 0, 0, 0, 0, expected, None
+    )
+
+    config = _config(storage, durability, case_dir, **extra)
+
+    try:
+        if processes == 1:
+            runs = [_hammer(storage, config, threads, ops, threading.Barrier(1))]
+        else:
+            ctx = multiprocessing.get_context("fork")
+            barrier = ctx.Barrier(processes)
+            queue = ctx.Queue()
+            children = [
+                ctx.Process(
+                    target=_process_main,
+                    args=(storage, config, threads, ops, barrier, queue),
+                )
+                for _ in range(processes)
+            ]
+            for child in children:
+                child.start()
+            runs = [queue.get(timeout=600) for _ in children]
+            for child in children:
+                child.join()
+            for run in runs:
+                if isinstance(run, Exception):
+                    raise run
+
+        latencies = sorted(x for run, _, _ in runs for x in run)
+        span = max(end for _, _, end in runs) - min(start for _, start, _ in runs)
+        result.increments_per_s = round(expected / span, 1)
+        result.p50_us = _percentile(latencies, 0.50)
+        result.p95_us = _percentile(latencies, 0.95)
+        result.p99_us = _percentile(latencies, 0.99)
+
+        store = build_store(config)
+        try:
+            result.actual = store.read()
+        finally:
+            store.close()
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        shutil.rmtree(case_dir, ignore_errors=True)
+    return result
+
+
+def format_table(results: list[CaseResult]) -> str:
+    header = (
+        "| storage | durability | location | procs x threads | incr/s "
+        "| p50 us | p95 us | p99 us | lost |"
+    )
+    lines = [header, "|" + "---|" * (header.count("|") - 1)]
+    for r in results:
+        if r.error:
+            lines.append(
+                f"| {r.storage} | {r.durability} | {r.location} "
+                f"| {r.processes} x {r.threads} | error: {r.error} |||||"
+            )
+            continue
+        lines.append(
+            f"| {r.storage} | {r.durability} | {r.location} "
+            f"| {r.processes} x {r.threads} | {r.increments_per_s:,.0f} "
+            f"| {r.p50_us} | {r.p95_us} | {r.p99_us} | {r.lost} |"
+        )
+    return "\n".join(lines)
+
+
+def _csv(value: str) -> list[str]:
+    return [item for item in value.split(",") if item]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Contention harness for VisitsCounter storage backends."
+    )
+    parser.add_argument("--storages", type=_csv, default=list(STORAGES))
+    parser.add_argument("--durability", type=_csv, default=list(DURABILITIES))
+    parser.add_argument("--threads", type=_csv, default=["1", "4"])
+    parser.add_argument("--processes", type=_csv, default=["1", "4"])
+    parser.add_argument("--ops", type=int, default=500, help="increments per thread")
+    parser.add_argument("--tmpfs-dir", type=Path, default=Path("/dev/shm"))
+    parser.add_argument("--disk-dir", type=Path, default=Path.cwd())
+    parser.add_argument("--redis-url", help="Redis server for the redis backend")
+    parser.add_argument("--json", type=Path, help="also write raw results here")
+    args = parser.parse_args(argv)
+
+    storages = [s for s in args.storages if s != "redis" or args.redis_url]
+    locations = [
+        (name, path)
+        for name, path in (("tmpfs", args.tmpfs_dir), ("disk", args.disk_dir))
+        if path.is_dir()
+    ]
+    shapes = [(1, int(t)) for t in args.threads]
+    shapes += [(int(p), 1) for p in args.processes if int(p) > 1]
+
+    results = []
+    for storage in storages:
+        durabilities = ["per-hit"] if storage == BASELINE else args.durability
+        for durability in durabilities:
+            for location, directory in locations:
+                for processes, threads in shapes:
+                    result = run_case(
+                        storage,
+                        durability,
+                        location,
+                        directory,
+                        processes,
+                        threads,
+                        args.ops,
+                        args.redis_url,
+                    )
+                    print(format_table([result]).splitlines()[-1], file=sys.stderr)
+                    results.append(result)
+
+    print(format_table(results))
+    if args.json:
+        rows = [{**asdict(r), "lost": r.lost} for r in results]
+        args.json.write_text(json.dumps(rows, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
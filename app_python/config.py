@@ -1,7 +1,15 @@
+import socket
 from pathlib import Path
+from typing import Literal
 
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+VisitsStorage = Literal["file", "log", "mmap", "sharded", "sqlite", "redis"]
+# Engines whose total is shared by every process writing to it; the others
+# keep it per process (or per pod) and lose updates with several workers.
+MULTI_WORKER_STORAGES = frozenset({"mmap", "sqlite", "redis"})
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=Path(__file__).parent / ".env")
@@ -9,7 +17,52 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 5000
     debug: bool = False
+    debug_token: str | None = None
+    debug_profile_max_seconds: float = 60
+    workers: int = 1
+    prometheus_multiproc_dir: str | None = None
+    metrics_min_interval_ms: int = 1000
+    metrics_max_label_sets: int = 500
+    runtime_metrics_interval_ms: int = 500
+    orjson_responses: bool = True
+    log_queue_size: int = 10_000
+    access_log_lines_per_second: float = 100
+    access_log_slow_ms: float = 500
+    slow_request_threshold_ms: float = 1000
+    slow_request_stacks_per_minute: float = 6
+    cache_control: dict[str, str] = {
+        "/": "no-cache",
+        "/health/": "no-store",
+        "/visits/": "public, max-age=1, stale-while-revalidate=5",
+    }
+    pod_name: str = Field(default_factory=socket.gethostname)
     visits_file: str = "/data/visits"
+    visits_durability: Literal["none", "interval", "fsync-every-write"] = "interval"
+    visits_flush_interval_ms: int = 1000
+    visits_flush_every: int = 100
+    visits_storage: VisitsStorage = "file"
+    visits_log_segment_bytes: int = 1024 * 1024
+    visits_shard_cache_ttl_ms: int = 1000
+    visits_sqlite_pool_size: int = 4
+    visits_redis_url: str = "redis://localhost:6379/0"
+    visits_redis_key: str = "visits"
+    visits_redis_pool_size: int = 4
+    visits_snapshot_interval_s: int = 60
+    visits_hll_precision: int = Field(default=12, ge=4, le=18)
+    visits_top_capacity: int = Field(default=100, ge=1)
+    visits_increment_mode: Literal["sync", "queued"] = "queued"
+    visits_queue_size: int = 10_000
+    visits_queue_overflow: Literal["block", "drop"] = "block"
+
+    @model_validator(mode="after")
+    def _check_workers_storage(self) -> "Settings":
+        if self.workers > 1 and self.visits_storage not in MULTI_WORKER_STORAGES:
+            raise ValueError(
+                f"WORKERS={self.workers} needs VISITS_STORAGE set to one of "
+                f"{', '.join(sorted(MULTI_WORKER_STORAGES))}; "
+                f"{self.visits_storage!r} would lose visits across workers"
+            )
+        return self
 
 
 settings = Settings.model_validate({})
@@ -0,0 +1,20 @@
+import hashlib
+
+
+def make_etag(value: str | bytes, weak: bool = False) -> str:
+    """Quote ``value`` (hashed if bytes) as an entity tag."""
+    if isinstance(value, bytes):
+        value = hashlib.blake2b(value, digest_size=8).hexdigest()
+    tag = f'"{value}"'
+    return f"W/{tag}" if weak else tag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header (RFC 9110)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
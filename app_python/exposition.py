@@ -0,0 +1,78 @@
+import asyncio
+import gzip
+import time
+from dataclasses import dataclass
+from typing import Annotated
+
+from fastapi import Depends
+from prometheus_client.exposition import choose_encoder, gzip_accepted
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from metrics import get_metrics_registry, metrics_payload_bytes, metrics_render_duration
+
+
+@dataclass(frozen=True, slots=True)
+class Exposition:
+    body: bytes
+    content_type: str
+    gzipped: bool
+    rendered_at: float
+
+
+class MetricsExposition:
+    """Renders ``/metrics`` at most once per ``min_interval_ms`` per variant.
+
+    A variant is the negotiated format (Prometheus text or OpenMetrics) plus
+    whether the client accepts gzip. Rendering runs in the threadpool, and
+    concurrent scrapes of a stale variant wait for a single render.
+    """
+
+    def __init__(self, min_interval_ms: int = 1000):
+        self._min_interval = min_interval_ms / 1000
+        self._cache: dict[tuple[str, bool], Exposition] = {}
+        self._lock = asyncio.Lock()
+
+    def _fresh(self, key: tuple[str, bool]) -> Exposition | None:
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached.rendered_at < self._min_interval:
+            return cached
+        return None
+
+    @staticmethod
+    def _render(encoder, content_type: str, gzipped: bool) -> Exposition:
+        fmt = "openmetrics" if "openmetrics" in content_type else "text"
+        with metrics_render_duration.labels(format=fmt).time():
+            body = encoder(get_metrics_registry())
+            if gzipped:
+                body = gzip.compress(body, compresslevel=6)
+        encoding = "gzip" if gzipped else "identity"
+        metrics_payload_bytes.labels(format=fmt, encoding=encoding).set(len(body))
+        return Exposition(body, content_type, gzipped, time.monotonic())
+
+    async def get(self, accept: str, accept_encoding: str) -> Exposition:
+        encoder, content_type = choose_encoder(accept)
+        key = (content_type, gzip_accepted(accept_encoding))
+        cached = self._fresh(key)
+        if cached is not None:
+            return cached
+        async with self._lock:
+            cached = self._fresh(key)
+            if cached is None:
+                cached = self._cache[key] = await run_in_threadpool(
+                    self._render, encoder, content_type, key[1]
+                )
+        return cached
+
+
+_exposition: MetricsExposition | None = None
+
+
+def get_metrics_exposition() -> MetricsExposition:
+    global _exposition
+    if _exposition is None:
+        _exposition = MetricsExposition(settings.metrics_min_interval_ms)
+    return _exposition
+
+
+MetricsExpositionDep = Annotated[MetricsExposition, Depends(get_metrics_exposition)]
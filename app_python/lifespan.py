@@ -4,7 +4,16 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from config import settings
 from exception_handlers import register_exception_handlers
+from metrics import mark_worker_dead
+from request_watchdog import get_slow_request_watchdog
+from routes.root.service import build_static_info
+from routes.visits.history import close_visits_history
+from routes.visits.recorder import close_visits_recorder, get_visits_recorder
+from routes.visits.service import close_visits_counter
+from routes.visits.unique import close_unique_visitors
+from runtime_metrics import RuntimeCollector
 
 logger = logging.getLogger(__name__)
 
@@ -14,5 +23,20 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up the application...")
     app.state.startup_time = time.time()
     register_exception_handlers(app)
+    app.state.static_info = build_static_info(app)
+    # Resolve through the overrides so tests never build the real recorder
+    # (and with it the counter and snapshots under VISITS_FILE).
+    recorder = app.dependency_overrides.get(get_visits_recorder, get_visits_recorder)
+    recorder().start()
+    runtime_collector = RuntimeCollector(settings.runtime_metrics_interval_ms)
+    runtime_collector.start()
+    get_slow_request_watchdog().start()
     yield
     logger.info("Shutting down the application...")
+    get_slow_request_watchdog().stop()
+    await runtime_collector.stop()
+    close_visits_recorder()
+    close_visits_counter()
+    close_visits_history()
+    close_unique_visitors()
+    mark_worker_dead()
@@ -1,23 +1,148 @@
+import atexit
+import copy
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
 
-from pythonjsonlogger.json import JsonFormatter
+try:
+    from pythonjsonlogger.orjson import OrjsonFormatter as JsonFormatter
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    from pythonjsonlogger.json import JsonFormatter
 
+from config import settings
+from metrics import log_queue_depth, log_records_dropped
+
+# Share of the queue records below WARNING may fill, so that under backpressure
+# DEBUG is dropped first, then INFO, and warnings/errors keep the last slots.
+_ADMIT_BELOW = {logging.DEBUG: 0.5, logging.INFO: 0.9}
+
+_exc_formatter = logging.Formatter()
+_listener: QueueListener | None = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to the writer thread without ever blocking the caller.
+
+    The message is rendered here, on the logging thread, so the writer never
+    sees live arguments or tracebacks; JSON encoding and I/O happen on the
+    writer. A record that doesn't fit is dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._limits = {
+            level: int(log_queue.maxsize * share)
+            for level, share in _ADMIT_BELOW.items()
+        }
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if not isinstance(record.msg, dict):  # dicts are merged into the JSON
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        limit = self._limit(record.levelno)
+        if limit is not None and self.queue.qsize() >= limit:
+            log_records_dropped.labels(level=record.levelname).inc()
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.labels(level=record.levelname).inc()
+            return
+        log_queue_depth.set(self.queue.qsize())
+
+    def _limit(self, levelno: int) -> int | None:
+        if levelno >= logging.WARNING or not self.queue.maxsize:
+            return None
+        if levelno <= logging.DEBUG:
+            return self._limits[logging.DEBUG]
+        return self._limits[logging.INFO]
+
+
+class BatchedStreamHandler(logging.StreamHandler):
+    """Stream handler for the writer thread that coalesces writes.
+
+    Formatted lines are buffered until ``source`` (the queue being drained)
+    runs empty or ``max_batch`` lines are pending, then written in one call.
+    """
+
+    def __init__(self, stream: TextIO, source: queue.Queue, max_batch: int = 256):
+        super().__init__(stream)
+        self._source = source
+        self._max_batch = max_batch
+        self._buffer: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+            if len(self._buffer) >= self._max_batch or self._source.empty():
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._buffer:
+                log_queue_depth.set(self._source.qsize())
+                self.stream.write("\n".join(self._buffer) + self.terminator)
+                self._buffer.clear()
+            super().flush()
+        finally:
+            self.release()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is None:
+        return
+    try:
+        _listener.stop()
+    except queue.Full:
+        return  # no room for the stop sentinel; the daemon writer dies with us
+    for handler in _listener.handlers:
+        try:
+            handler.flush()
+        except (OSError, ValueError):
+            pass  # stream already closed at interpreter exit
+    _listener = None
+
+
+def setup_json_logging(stream: TextIO | None = None):
+    """Configure JSON structured logging for all loggers.
+
+    Records go through a bounded queue (``LOG_QUEUE_SIZE``) to a writer
+    thread, so a slow stdout never stalls the event loop.
+    """
+    global _listener
+    _stop_listener()
 
-def setup_json_logging():
-    """Configure JSON structured logging for all loggers."""
     formatter = JsonFormatter(
         fmt="%(asctime)s %(levelname)s %(name)s %(message)s",
         rename_fields={"asctime": "timestamp", "levelname": "level"},
     )
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(formatter)
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    writer = BatchedStreamHandler(stream or sys.stdout, log_queue)
+    writer.setFormatter(formatter)
+    _listener = QueueListener(log_queue, writer)
+    _listener.start()
 
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
-    root_logger.addHandler(handler)
+    root_logger.addHandler(BoundedQueueHandler(log_queue))
     root_logger.setLevel(logging.INFO)
 
     # Reduce noise from uvicorn access logs (we log requests ourselves)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+
+atexit.register(_stop_listener)
@@ -1,4 +1,21 @@
-from prometheus_client import Counter, Gauge, Histogram
+import os
+from pathlib import Path
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+)
+
+# With PROMETHEUS_MULTIPROC_DIR set (WORKERS > 1), every worker writes its
+# values to mmap'd files in that directory and /metrics aggregates them. The
+# variable must be set before prometheus_client is imported, which app.py does
+# before spawning workers. Gauges therefore use set()/inc() rather than
+# set_function(), which multiprocess mode ignores, and say how worker values
+# are combined.
 
 # RED Method metrics
 http_requests_total = Counter(
@@ -17,6 +34,12 @@ http_request_duration_seconds = Histogram(
 http_requests_in_progress = Gauge(
     "http_requests_in_progress",
     "HTTP requests currently being processed",
+    multiprocess_mode="livesum",
+)
+
+http_label_sets_overflow = Counter(
+    "devops_info_http_label_sets_overflow_total",
+    "Requests recorded under the overflow labels because the label set cap was hit",
 )
 
 # Application-specific metrics
@@ -29,4 +52,142 @@ endpoint_calls = Counter(
 system_info_duration = Histogram(
     "devops_info_system_collection_seconds",
     "Time spent collecting system information",
+    ["snapshot"],
+)
+
+visits_queue_depth = Gauge(
+    "devops_info_visits_queue_depth",
+    "Visit increments waiting to be applied to the counter",
+    multiprocess_mode="livesum",
+)
+
+visits_increments_dropped = Counter(
+    "devops_info_visits_increments_dropped_total",
+    "Visit increments dropped because the increment queue was full",
+)
+
+visits_increments_blocked = Counter(
+    "devops_info_visits_increments_blocked_total",
+    "Visit increments that had to wait for room in the increment queue",
+)
+
+log_queue_depth = Gauge(
+    "devops_info_log_queue_depth",
+    "Log records waiting to be written to stdout",
+    # Each worker has its own queue; the fullest one is the one about to drop.
+    multiprocess_mode="livemax",
+)
+
+log_records_dropped = Counter(
+    "devops_info_log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+    ["level"],
+)
+
+metrics_render_duration = Histogram(
+    "devops_info_metrics_render_seconds",
+    "Time spent rendering the /metrics exposition",
+    ["format"],
+)
+
+metrics_payload_bytes = Gauge(
+    "devops_info_metrics_payload_bytes",
+    "Size of the last rendered /metrics exposition",
+    ["format", "encoding"],
+    multiprocess_mode="livemax",
+)
+
+# Runtime health
+event_loop_lag = Histogram(
+    "devops_info_event_loop_lag_seconds",
+    "How late the event loop woke a periodic timer",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+gc_pause_duration = Histogram(
+    "devops_info_gc_pause_seconds",
+    "Garbage collector pause duration",
+    ["generation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
 )
+
+threadpool_in_use = Gauge(
+    "devops_info_threadpool_threads_in_use",
+    "Worker threads borrowed from the anyio default threadpool",
+    multiprocess_mode="livesum",
+)
+
+threadpool_capacity = Gauge(
+    "devops_info_threadpool_threads_capacity",
+    "Size of the anyio default threadpool",
+    multiprocess_mode="livesum",
+)
+
+open_fds = Gauge(
+    "devops_info_open_fds",
+    "Open file descriptors",
+    multiprocess_mode="livesum",
+)
+
+slow_requests = Counter(
+    "devops_info_slow_requests_total",
+    "Requests that exceeded the watchdog threshold while in flight",
+    ["outcome"],
+)
+
+
+def multiprocess_dir() -> str | None:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def prepare_multiprocess_dir(path: str | Path) -> None:
+    """Create ``path`` and remove metric files left over from a previous run."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for db_file in path.glob("*.db"):
+        db_file.unlink()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def reap_dead_workers(path: str) -> None:
+    """Drop live-gauge files of workers that exited without cleaning up.
+
+    Counters and histograms of dead workers are kept so totals never go
+    backwards; only ``live*`` gauges describe running processes.
+    """
+    for db_file in Path(path).glob("gauge_live*_*.db"):
+        pid = int(db_file.stem.rsplit("_", 1)[1])
+        if not _pid_alive(pid):
+            multiprocess.mark_process_dead(pid, path)
+
+
+def mark_worker_dead() -> None:
+    """Remove this worker's live-gauge files on graceful shutdown."""
+    path = multiprocess_dir()
+    if path:
+        multiprocess.mark_process_dead(os.getpid(), path)
+
+
+_registry: CollectorRegistry | None = None
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    """Registry to expose on ``/metrics``: aggregated across workers if needed."""
+    global _registry
+    path = multiprocess_dir()
+    if not path:
+        return REGISTRY
+    reap_dead_workers(path)
+    if _registry is None:
+        _registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(_registry, path)
+    return _registry
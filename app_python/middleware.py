@@ -1,73 +1,289 @@
 import logging
+import math
+import os
+import re
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from prometheus_client import Counter, Histogram
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from config import settings
+from etag import etag_matches
 from metrics import (
+    http_label_sets_overflow,
     http_request_duration_seconds,
     http_requests_in_progress,
     http_requests_total,
 )
+from request_watchdog import SlowRequestWatchdog, get_slow_request_watchdog
 
 logger = logging.getLogger("app.access")
 
 
-def _normalize_path(path: str) -> str:
-    """Normalize path to keep label cardinality low."""
-    if path in ("/", "/health", "/metrics"):
-        return path
-    return "/other"
+UNMATCHED_PATH = "/other"
+OVERFLOW_METHOD = "OTHER"
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware that logs each HTTP request/response and tracks Prometheus metrics."""
+_TRACEPARENT = re.compile(rb"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._-]{1,64}$")
+_NO_TRACE = b"0" * 32
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        start_time = time.time()
-        method = request.method
-        path = _normalize_path(request.url.path)
 
-        http_requests_in_progress.inc()
+def _trace_id(scope: Scope) -> str:
+    """Trace ID from a W3C ``traceparent`` or ``X-Request-ID`` header, or a new one.
+
+    Header values that don't look like an ID are ignored, so a client can't
+    inject arbitrary text into logs or exemplars.
+    """
+    request_id = None
+    for name, value in scope["headers"]:
+        if name == b"traceparent":
+            match = _TRACEPARENT.match(value)
+            if match and match.group(1) != _NO_TRACE:
+                return match.group(1).decode()
+        elif name == b"x-request-id" and _REQUEST_ID.match(value):
+            request_id = value.decode()
+    return request_id or os.urandom(16).hex()
+
+
+def _route_path(scope: Scope) -> str:
+    """Label for the route the router matched, e.g. ``/visits/history``.
+
+    Requests that matched no API route share one label, so scanners probing
+    random URLs cannot grow the label space.
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", UNMATCHED_PATH)
+
+
+class AccessLogSampler:
+    """Keeps every ``rate``-th successful request, retuning ``rate`` each window.
+
+    ``rate`` is chosen from the previous window's traffic so that roughly
+    ``lines_per_second`` records are kept; 0 disables sampling. Keeping every
+    ``rate``-th request (rather than a random one) makes the summed weights
+    of kept records match the real request count.
+    """
+
+    def __init__(self, lines_per_second: float, window_s: float = 1.0):
+        self.lines_per_second = lines_per_second
+        self.window_s = window_s
+        self.rate = 1
+        self._countdown = 1
+        self._seen = 0
+        self._window_start = time.monotonic()
+
+    def sample(self, now: float) -> int:
+        """Return the weight to log this request with, or 0 to drop it."""
+        if self.lines_per_second <= 0:
+            return 1
+        elapsed = now - self._window_start
+        if elapsed >= self.window_s:
+            per_second = self._seen / elapsed
+            self.rate = max(1, math.ceil(per_second / self.lines_per_second))
+            self._countdown = min(self._countdown, self.rate)
+            self._seen = 0
+            self._window_start = now
+        self._seen += 1
+        self._countdown -= 1
+        if self._countdown > 0:
+            return 0
+        self._countdown = self.rate
+        return self.rate
+
+
+class RequestLoggingMiddleware:
+    """ASGI middleware that logs each HTTP request/response and tracks Prometheus metrics.
+
+    The status code is taken from the ``http.response.start`` message, so
+    streaming bodies pass through untouched. The ``endpoint`` label is the
+    matched route template and unknown methods are folded into ``OTHER``.
+    Labelled metric children are bound once per label set and reused; past
+    ``max_label_sets`` distinct sets, new ones are recorded under
+    ``OTHER``/``/other`` with the status class (``4xx``).
+
+    Each request gets a trace ID (see :func:`_trace_id`), echoed back as
+    ``X-Request-ID`` and stored in ``request.state.trace_id``. Requests whose
+    access log line is kept also attach it as an exemplar to the latency
+    histogram, so every exemplar leads to a log line.
+
+    Successful requests are logged through an :class:`AccessLogSampler`;
+    4xx/5xx responses, exceptions and requests slower than ``slow_ms`` are
+    always logged. Every record carries the ``sample_weight`` it stands for.
+
+    In-flight requests are registered with a :class:`SlowRequestWatchdog`,
+    which logs their stacks if they are still running past its threshold.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        lines_per_second: float = settings.access_log_lines_per_second,
+        slow_ms: float = settings.access_log_slow_ms,
+        max_label_sets: int = settings.metrics_max_label_sets,
+        watchdog: SlowRequestWatchdog | None = None,
+    ):
+        self.app = app
+        if watchdog is None:
+            watchdog = get_slow_request_watchdog()
+        self._watchdog = watchdog if watchdog.enabled else None
+        self._max_label_sets = max_label_sets
+        self._sampler = AccessLogSampler(lines_per_second)
+        self._slow_s = slow_ms / 1000
+        self._requests: dict[tuple[str, str, str], Counter] = {}
+        self._durations: dict[tuple[str, str], Histogram] = {}
+
+    def _observe(
+        self, scope: Scope, status: int, duration: float, trace_id: str | None
+    ) -> None:
+        method = scope["method"]
+        if method not in _METHODS:
+            method = OVERFLOW_METHOD
+        path = _route_path(scope)
+        key = (method, path, str(status))
+        requests = self._requests.get(key)
+        if requests is None:
+            if len(self._requests) >= self._max_label_sets:
+                http_label_sets_overflow.inc()
+                key = (OVERFLOW_METHOD, UNMATCHED_PATH, f"{status // 100}xx")
+                method, path = key[:2]
+                requests = self._requests.get(key)
+            if requests is None:
+                requests = self._requests[key] = http_requests_total.labels(
+                    method=method, endpoint=path, status=key[2]
+                )
+        requests.inc()
 
+        durations = self._durations.get(key[:2])
+        if durations is None:
+            durations = self._durations[key[:2]] = http_request_duration_seconds.labels(
+                method=method, endpoint=path
+            )
+        durations.observe(duration, {"trace_id": trace_id} if trace_id else None)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        client = scope.get("client")
+        status_code = 500
+        trace_id = _trace_id(scope)
+        scope.setdefault("state", {})["trace_id"] = trace_id
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", trace_id)
+            await send(message)
+
+        http_requests_in_progress.inc()
+        in_flight = (
+            self._watchdog.begin(trace_id, method, scope["path"])
+            if self._watchdog
+            else None
+        )
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             http_requests_in_progress.dec()
-            http_requests_total.labels(method=method, endpoint=path, status="500").inc()
-            http_request_duration_seconds.labels(method=method, endpoint=path).observe(
-                duration
-            )
+            self._observe(scope, 500, duration, trace_id)
             logger.error(
                 "Request failed",
                 extra={
-                    "method": request.method,
-                    "path": request.url.path,
-                    "client_ip": request.client.host if request.client else "unknown",
+                    "trace_id": trace_id,
+                    "method": method,
+                    "path": scope["path"],
+                    "client_ip": client[0] if client else "unknown",
                     "duration_ms": round(duration * 1000, 2),
                     "error": str(exc),
+                    "sample_weight": 1,
                 },
             )
             raise
+        finally:
+            if in_flight is not None:
+                self._watchdog.end(in_flight)
 
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         http_requests_in_progress.dec()
-        status = str(response.status_code)
-        http_requests_total.labels(method=method, endpoint=path, status=status).inc()
-        http_request_duration_seconds.labels(method=method, endpoint=path).observe(
-            duration
-        )
 
+        if status_code >= 400 or duration >= self._slow_s:
+            weight = 1
+        else:
+            weight = self._sampler.sample(time.monotonic())
+        logged = weight and logger.isEnabledFor(logging.INFO)
+        self._observe(scope, status_code, duration, trace_id if logged else None)
+        if not logged:
+            return
         logger.info(
             "Request processed",
             extra={
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "client_ip": request.client.host if request.client else "unknown",
+                "trace_id": trace_id,
+                "method": method,
+                "path": scope["path"],
+                "status_code": status_code,
+                "client_ip": client[0] if client else "unknown",
                 "duration_ms": round(duration * 1000, 2),
+                "sample_weight": weight,
             },
         )
-        return response
+
+
+class ConditionalRequestMiddleware:
+    """Applies per-route Cache-Control and answers If-None-Match with 304.
+
+    Routes opt in to revalidation by setting an ``ETag`` header; the policy
+    for each path comes from ``settings.cache_control``. On a match the
+    original body is discarded as it streams through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        policy = settings.cache_control.get(scope["path"])
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if policy is None and if_none_match is None:
+            await self.app(scope, receive, send)
+            return
+
+        not_modified = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal not_modified
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    await send(message)
+                    return
+                headers = MutableHeaders(scope=message)
+                if policy and "cache-control" not in headers:
+                    headers["Cache-Control"] = policy
+                etag = headers.get("etag")
+                if etag and if_none_match and etag_matches(if_none_match, etag):
+                    not_modified = True
+                    kept = [("etag", etag)]
+                    if "cache-control" in headers:
+                        kept.append(("cache-control", headers["cache-control"]))
+                    message = {
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": [(k.encode(), v.encode()) for k, v in kept],
+                    }
+            elif message["type"] == "http.response.body" and not_modified:
+                if message.get("more_body", False):
+                    return
+                message = {"type": "http.response.body", "body": b""}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
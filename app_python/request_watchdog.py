@@ -0,0 +1,183 @@
+import asyncio
+import contextvars
+import logging
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from types import FrameType
+
+from config import settings
+from metrics import slow_requests
+
+logger = logging.getLogger("app.watchdog")
+
+_current_request: contextvars.ContextVar["InFlightRequest | None"] = (
+    contextvars.ContextVar("current_request", default=None)
+)
+
+
+@dataclass(eq=False, slots=True)
+class InFlightRequest:
+    trace_id: str
+    method: str
+    path: str
+    started: float
+    loop_thread: int
+    task: asyncio.Task | None
+    reported: bool = field(default=False)
+
+
+def _format_stack(frame: FrameType | None) -> list[str]:
+    """``file:line function`` entries, outermost first, without reading source."""
+    summary = traceback.StackSummary.extract(
+        traceback.walk_stack(frame), lookup_lines=False
+    )
+    return [f"{f.filename}:{f.lineno} {f.name}" for f in reversed(summary)]
+
+
+def _task_stack(task: asyncio.Task | None) -> list[str]:
+    """Where the request's coroutine chain is suspended, outermost first."""
+    entries = []
+    awaitable = task.get_coro() if task is not None else None
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "gi_frame", None
+        )
+        if frame is None:
+            break
+        code = frame.f_code
+        entries.append(f"{code.co_filename}:{frame.f_lineno} {code.co_name}")
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "gi_yieldfrom", None
+        )
+    return entries
+
+
+def _serves(frame: FrameType | None, request: InFlightRequest) -> bool:
+    """Whether a worker thread is running a call made on behalf of ``request``.
+
+    Threadpool workers run each call inside a copy of the caller's context
+    (a ``context`` local of the worker loop), so the request is found by
+    looking it up in the contexts on the thread's stack.
+    """
+    while frame is not None:
+        context = frame.f_locals.get("context")
+        if isinstance(context, contextvars.Context):
+            return context.get(_current_request) is request
+        frame = frame.f_back
+    return False
+
+
+class SlowRequestWatchdog:
+    """Logs where requests are stuck once they run longer than ``threshold_ms``.
+
+    Requests register themselves with :meth:`begin`/:meth:`end`. A daemon
+    thread (so it still runs when the event loop is blocked) checks the
+    in-flight requests and, for each one past the threshold, logs the stack
+    of the event loop thread, the request task's await chain and any
+    threadpool worker currently running code for that request. Each request
+    is reported once and at most ``stacks_per_minute`` reports are written;
+    the rest are only counted.
+    """
+
+    def __init__(self, threshold_ms: float = 1000, stacks_per_minute: float = 6):
+        self.threshold = threshold_ms / 1000
+        self._min_gap = 60 / stacks_per_minute if stacks_per_minute > 0 else None
+        self._last_report = float("-inf")
+        self._in_flight: dict[int, InFlightRequest] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def begin(self, trace_id: str, method: str, path: str) -> InFlightRequest:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        request = InFlightRequest(
+            trace_id, method, path, time.monotonic(), threading.get_ident(), task
+        )
+        self._in_flight[id(request)] = request
+        _current_request.set(request)
+        return request
+
+    def end(self, request: InFlightRequest) -> None:
+        self._in_flight.pop(id(request), None)
+
+    def _report(self, request: InFlightRequest, now: float) -> None:
+        request.reported = True
+        if self._min_gap is None or now - self._last_report < self._min_gap:
+            slow_requests.labels(outcome="suppressed").inc()
+            return
+        self._last_report = now
+        slow_requests.labels(outcome="logged").inc()
+
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()
+        stacks = {"event_loop": _format_stack(frames.get(request.loop_thread))}
+        task_stack = _task_stack(request.task)
+        if task_stack:
+            stacks["task"] = task_stack
+        for ident, frame in frames.items():
+            if ident in (me, request.loop_thread) or not _serves(frame, request):
+                continue
+            stacks[names.get(ident, f"thread-{ident}")] = _format_stack(frame)
+        logger.warning(
+            "Slow request in flight",
+            extra={
+                "trace_id": request.trace_id,
+                "method": request.method,
+                "path": request.path,
+                "elapsed_ms": round((now - request.started) * 1000, 2),
+                "stacks": stacks,
+            },
+        )
+
+    def check(self, now: float | None = None) -> None:
+        """Report every in-flight request that crossed the threshold."""
+        now = time.monotonic() if now is None else now
+        for request in list(self._in_flight.values()):
+            if not request.reported and now - request.started >= self.threshold:
+                self._report(request, now)
+
+    def _run(self) -> None:
+        interval = min(max(self.threshold / 4, 0.01), 1.0)
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Slow request watchdog check failed")
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="slow-request-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+_watchdog: SlowRequestWatchdog | None = None
+
+
+def get_slow_request_watchdog() -> SlowRequestWatchdog:
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = SlowRequestWatchdog(
+            settings.slow_request_threshold_ms, settings.slow_request_stacks_per_minute
+        )
+    return _watchdog
@@ -0,0 +1,23 @@
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+def _json_response_class() -> type[JSONResponse]:
+    """Response class for routers; orjson-backed when enabled and installed.
+
+    FastAPI serializes the response model to JSON-compatible values (ISO 8601
+    strings for datetimes) before rendering, so both classes emit identical
+    bodies.
+    """
+    if settings.orjson_responses and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+DefaultJSONResponse = _json_response_class()
@@ -1,5 +1,6 @@
+from .debug.router import debug_router
 from .health.router import health_router
 from .root.router import root_router
 from .visits.router import visits_router
 
-__all__ = ["root_router", "health_router", "visits_router"]
+__all__ = ["root_router", "health_router", "visits_router", "debug_router"]
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+
+from .service import (
+    DebugAccessDep,
+    SamplingProfiler,
+    acquire_profile_slot,
+    release_profile_slot,
+)
+
+_DEFAULT_SECONDS = min(30, settings.debug_profile_max_seconds)
+
+debug_router = APIRouter(prefix="/debug", include_in_schema=False)
+
+
+@debug_router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    _: DebugAccessDep,
+    seconds: Annotated[
+        float, Query(gt=0, le=settings.debug_profile_max_seconds)
+    ] = _DEFAULT_SECONDS,
+    interval_ms: Annotated[float, Query(ge=1, le=1000)] = 10,
+) -> PlainTextResponse:
+    """Sample every thread for ``seconds`` and return collapsed stacks."""
+    if not acquire_profile_slot():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        profiler = SamplingProfiler(interval_ms)
+        profiler.start(max_seconds=seconds)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stacks = profiler.stop()
+    finally:
+        release_profile_slot()
+    return PlainTextResponse(
+        stacks, headers={"X-Profile-Samples": str(profiler.samples)}
+    )
@@ -0,0 +1,103 @@
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request
+
+from config import settings
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({Path(code.co_filename).name})"
+
+
+class SamplingProfiler:
+    """Statistical profiler over every thread of the process.
+
+    A daemon thread wakes every ``interval_ms``, walks the current frame of
+    each other thread (``sys._current_frames()``) and counts the stack. The
+    event loop thread is sampled like any other, so time blocked in a
+    handler shows up under the loop's frames. Results are Brendan Gregg's
+    collapsed format, one ``thread;outer;...;inner count`` line per stack.
+    """
+
+    def __init__(self, interval_ms: float = 10):
+        self._interval = interval_ms / 1000
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.samples = 0
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self._stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self, deadline: float) -> None:
+        while not self._stop.wait(self._interval) and time.monotonic() < deadline:
+            self._sample()
+
+    def start(self, max_seconds: float) -> None:
+        deadline = time.monotonic() + max_seconds
+        self._thread = threading.Thread(
+            target=self._run, args=(deadline,), name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks, hottest first."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self._stacks.most_common()
+        )
+
+
+_profile_lock = threading.Lock()
+
+
+def acquire_profile_slot() -> bool:
+    """Claim the single profiling slot of this process; False if it is taken."""
+    return _profile_lock.acquire(blocking=False)
+
+
+def release_profile_slot() -> None:
+    _profile_lock.release()
+
+
+def require_debug_access(request: Request) -> None:
+    """Allow debug endpoints in ``DEBUG`` mode or with ``DEBUG_TOKEN``.
+
+    Anything else gets a 404. The router itself is only mounted when one of
+    the two is configured, and is kept out of the OpenAPI schema.
+    """
+    if settings.debug:
+        return
+    token = settings.debug_token
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if (
+        token
+        and scheme.lower() == "bearer"
+        and secrets.compare_digest(credentials.encode(), token.encode())
+    ):
+        return
+    raise HTTPException(status_code=404, detail="Not Found")
+
+
+DebugAccessDep = Annotated[None, Depends(require_debug_access)]
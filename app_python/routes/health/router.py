@@ -1,12 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+
+from etag import make_etag
+from responses import DefaultJSONResponse
 
 from .models import HealthCheckResponse
 from .service import HealthServiceDep
 
-health_router = APIRouter(prefix="/health")
+health_router = APIRouter(prefix="/health", default_response_class=DefaultJSONResponse)
 
 
 @health_router.get("/")
-async def health_check(service: HealthServiceDep) -> HealthCheckResponse:
+async def health_check(
+    response: Response, service: HealthServiceDep
+) -> HealthCheckResponse:
     """Health check endpoint"""
-    return await service.get_health_check()
+    health = await service.get_health_check()
+    # Timestamp and uptime always move; only the status is worth revalidating.
+    response.headers["ETag"] = make_etag(health.status, weak=True)
+    return health
@@ -1,17 +1,21 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
-from routes.visits.service import VisitsCounterDep
+from responses import DefaultJSONResponse
+from routes.visits.recorder import VisitsRecorderDep
 
 from .models import APIInfoResponse
 from .service import RootServiceDep
 
-root_router = APIRouter(prefix="")
+root_router = APIRouter(prefix="", default_response_class=DefaultJSONResponse)
 
 
-@root_router.get("/")
+@root_router.get("/", response_model=APIInfoResponse)
 async def get_api_info(
-    service: RootServiceDep, counter: VisitsCounterDep
-) -> APIInfoResponse:
+    request: Request, service: RootServiceDep, recorder: VisitsRecorderDep
+) -> Response:
     """Get API information and increment visit counter."""
-    counter.increment()
+    await recorder.record(
+        client_ip=request.client.host if request.client else "unknown",
+        user_agent=request.headers.get("user-agent", ""),
+    )
     return await service.get_api_info()
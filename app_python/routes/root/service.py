@@ -2,17 +2,19 @@ import os
 import platform
 import socket
 import time
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Annotated
 
-from fastapi import Depends, Request
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.routing import APIRoute
+from pydantic_core import to_json
 
 from dependencies import AppInstanceDep
+from etag import make_etag
 from metrics import endpoint_calls, system_info_duration
 
 from .models import (
-    APIInfoResponse,
     Endpoint,
     RequestInfo,
     RuntimeInfo,
@@ -21,39 +23,102 @@ from .models import (
 )
 
 
+@dataclass(frozen=True, slots=True)
+class StaticInfo:
+    """Sections of ``GET /`` that cannot change while the process runs.
+
+    ``head`` and ``tail`` are the pre-serialized JSON around the dynamic
+    ``runtime`` and ``request`` sections; ``etag`` is a weak entity tag over
+    both, since only the static sections are stable between responses.
+    """
+
+    service: ServiceInfo
+    system: SystemInfo
+    endpoints: list[Endpoint]
+    head: bytes
+    tail: bytes
+    etag: str
+
+
+def _get_service_info(app: FastAPI) -> ServiceInfo:
+    return ServiceInfo(
+        name=app.title,
+        version=app.version,
+        description=app.description,
+    )
+
+
+def _get_system_info() -> SystemInfo:
+    return SystemInfo(
+        hostname=socket.gethostname(),
+        platform=platform.system(),
+        platform_version=platform.version(),
+        architecture=platform.machine(),
+        cpu_count=os.cpu_count() or 1,
+        python_version=platform.python_version(),
+    )
+
+
+def _get_endpoints_info(app: FastAPI) -> list[Endpoint]:
+    endpoints = []
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            for method in route.methods:
+                endpoints.append(
+                    Endpoint(
+                        path=route.path,
+                        method=method,
+                        description=route.description,
+                    )
+                )
+    return endpoints
+
+
+def build_static_info(app: FastAPI) -> StaticInfo:
+    """Collect and serialize the static sections of ``GET /`` once."""
+    service = _get_service_info(app)
+    system = _get_system_info()
+    endpoints = _get_endpoints_info(app)
+    head = b'{"service":%b,"system":%b,"runtime":' % (
+        to_json(service),
+        to_json(system),
+    )
+    tail = b',"endpoints":%b}' % to_json(endpoints)
+    return StaticInfo(
+        service=service,
+        system=system,
+        endpoints=endpoints,
+        head=head,
+        tail=tail,
+        etag=make_etag(head + tail, weak=True),
+    )
+
+
 class RootService:
     def __init__(self, app: AppInstanceDep, request: Request):
         self.app = app
         self.request = request
 
-    async def _get_service_info(self) -> ServiceInfo:
-        return ServiceInfo(
-            name=self.app.title,
-            version=self.app.version,
-            description=self.app.description,
-        )
+    def _get_static_info(self) -> StaticInfo:
+        static_info = getattr(self.app.state, "static_info", None)
+        if static_info is not None:
+            with system_info_duration.labels(snapshot="hit").time():
+                return static_info
+        with system_info_duration.labels(snapshot="refresh").time():
+            static_info = build_static_info(self.app)
+        self.app.state.static_info = static_info
+        return static_info
 
-    @staticmethod
-    async def _get_system_info() -> SystemInfo:
-        return SystemInfo(
-            hostname=socket.gethostname(),
-            platform=platform.system(),
-            platform_version=platform.version(),
-            architecture=platform.machine(),
-            cpu_count=os.cpu_count() or 1,
-            python_version=platform.python_version(),
-        )
-
-    async def _get_runtime_info(self) -> RuntimeInfo:
+    def _get_runtime_info(self) -> RuntimeInfo:
         uptime_seconds = int(time.time() - self.app.state.startup_time)
         return RuntimeInfo(
             uptime_seconds=uptime_seconds,
             uptime_human=f"{int(uptime_seconds // 3600)}h {int((uptime_seconds % 3600) // 60)}m",
             current_time=datetime.now(UTC),
-            timezone=str(datetime.now().astimezone().tzinfo),
+            timezone=time.localtime().tm_zone,
         )
 
-    async def _get_request_info(self) -> RequestInfo:
+    def _get_request_info(self) -> RequestInfo:
         return RequestInfo(
             client_ip=self.request.client.host,
             user_agent=self.request.headers.get("user-agent"),
@@ -61,30 +126,20 @@ class RootService:
             path=self.request.url.path,
         )
 
-    async def _get_endoints_info(self) -> list[Endpoint]:
-        endpoints = []
-        for route in self.app.routes:
-            if isinstance(route, APIRoute):
-                for method in route.methods:
-                    endpoints.append(
-                        Endpoint(
-                            path=route.path,
-                            method=method,
-                            description=route.description,
-                        )
-                    )
-        return endpoints
-
-    async def get_api_info(self) -> APIInfoResponse:
+    async def get_api_info(self) -> Response:
+        """Build the ``APIInfoResponse`` JSON around the cached static sections."""
         endpoint_calls.labels(endpoint="/").inc()
-        with system_info_duration.time():
-            system = await self._get_system_info()
-        return APIInfoResponse(
-            service=await self._get_service_info(),
-            system=system,
-            runtime=await self._get_runtime_info(),
-            request=await self._get_request_info(),
-            endpoints=await self._get_endoints_info(),
+        static_info = self._get_static_info()
+        body = b'%b%b,"request":%b%b' % (
+            static_info.head,
+            to_json(self._get_runtime_info()),
+            to_json(self._get_request_info()),
+            static_info.tail,
+        )
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"ETag": static_info.etag},
         )
 
 
@@ -0,0 +1,256 @@
+import logging
+import struct
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Annotated
+
+from fastapi import Depends
+
+from config import settings
+
+from .snapshot import SharedSnapshot, snapshot_shard
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<II")
+
+
+class RingSeries:
+    """Fixed-size ring of ``slots`` buckets, each ``step`` seconds wide.
+
+    Every slot remembers which bucket (``timestamp // step``) it currently
+    holds, so a stale slot is recycled on write and ignored on read without
+    ever sweeping the ring.
+    """
+
+    def __init__(self, step: int, slots: int):
+        self.step = step
+        self.slots = slots
+        self._buckets = array("q", [-1]) * slots
+        self._counts = array("Q", [0]) * slots
+
+    @property
+    def span(self) -> int:
+        return self.step * self.slots
+
+    def add(self, timestamp: float, n: int = 1) -> None:
+        bucket = int(timestamp // self.step)
+        slot = bucket % self.slots
+        held = self._buckets[slot]
+        if held > bucket:
+            return  # older than the ring span; never clobber newer data
+        if held != bucket:
+            self._buckets[slot] = bucket
+            self._counts[slot] = 0
+        self._counts[slot] += n
+
+    def merge(self, other: "RingSeries") -> None:
+        """Add ``other``'s counts (same step and size) into this ring."""
+        for bucket, count in zip(other._buckets, other._counts, strict=True):
+            if bucket >= 0 and count:
+                self.add(bucket * self.step, count)
+
+    def count(self, bucket: int) -> int:
+        slot = bucket % self.slots
+        return self._counts[slot] if self._buckets[slot] == bucket else 0
+
+    def dump(self) -> bytes:
+        header = _HEADER.pack(self.step, self.slots)
+        return header + self._buckets.tobytes() + self._counts.tobytes()
+
+    def load(self, data: bytes, offset: int) -> int:
+        """Restore from ``dump()`` output at ``offset``; return the next offset."""
+        step, slots = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        buckets = array("q")
+        counts = array("Q")
+        buckets.frombytes(data[offset : offset + slots * buckets.itemsize])
+        offset += slots * buckets.itemsize
+        counts.frombytes(data[offset : offset + slots * counts.itemsize])
+        offset += slots * counts.itemsize
+        if (step, slots) == (self.step, self.slots):
+            self._buckets, self._counts = buckets, counts
+        return offset
+
+
+class VisitsHistory:
+    """Per-second and per-minute visit counts in constant memory.
+
+    Recording a visit is O(1). The rings are snapshotted every
+    ``snapshot_interval_s`` and on close, to ``file_path`` or, with a
+    ``shard``, to ``<file_path>.<shard>`` (see :class:`SharedSnapshot`). An
+    unsharded history is restored from its file on startup; a sharded one
+    starts empty and adds the rings of every other snapshot sharing
+    ``file_path`` (re-read at most every ``cache_ttl_ms``) to its queries.
+    """
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        seconds: int = 3600,
+        minutes: int = 24 * 60,
+        snapshot_interval_s: int = 60,
+        shard: str | None = None,
+        cache_ttl_ms: int = 1000,
+    ):
+        self._lock = threading.Lock()
+        self._shape = (seconds, minutes)
+        self._series = self._new_series()
+        self._cache_ttl = cache_ttl_ms / 1000
+        self._peers_lock = threading.Lock()
+        self._peers: tuple[RingSeries, ...] | None = None
+        self._peers_expire_at = 0.0
+        self._snapshot: SharedSnapshot | None = None
+        if file_path is not None:
+            self._snapshot = SharedSnapshot(
+                file_path,
+                shard,
+                self._dump,
+                self._merge_dumps,
+                snapshot_interval_s,
+                name="visits-history",
+            )
+            self._load(self._snapshot.read_own())
+
+    def _new_series(self) -> tuple[RingSeries, ...]:
+        seconds, minutes = self._shape
+        return RingSeries(1, seconds), RingSeries(60, minutes)
+
+    def _parse(self, data: bytes) -> tuple[RingSeries, ...] | None:
+        series = self._new_series()
+        try:
+            offset = 0
+            for ring in series:
+                offset = ring.load(data, offset)
+        except (struct.error, ValueError):
+            logger.warning("Invalid visits history snapshot, ignoring it")
+            return None
+        return series
+
+    @staticmethod
+    def _add(into: tuple[RingSeries, ...], other: tuple[RingSeries, ...]) -> None:
+        for ring, other_ring in zip(into, other, strict=True):
+            ring.merge(other_ring)
+
+    def _merge_dumps(self, data: bytes | None, other: bytes) -> bytes | None:
+        extra = self._parse(other)
+        if extra is None:
+            return data
+        merged = self._parse(data) if data is not None else None
+        if merged is None:
+            merged = extra
+        else:
+            self._add(merged, extra)
+        return b"".join(ring.dump() for ring in merged)
+
+    def _peer_series(self) -> tuple[RingSeries, ...] | None:
+        """Sum of every other writer's rings, re-read at most every TTL."""
+        if self._snapshot is None:
+            return None
+        with self._peers_lock:
+            now = time.monotonic()
+            if now >= self._peers_expire_at:
+                peers = None
+                for data in self._snapshot.read_peers():
+                    series = self._parse(data)
+                    if series is None:
+                        continue
+                    if peers is None:
+                        peers = series
+                    else:
+                        self._add(peers, series)
+                self._peers = peers
+                self._peers_expire_at = now + self._cache_ttl
+            return self._peers
+
+    @property
+    def max_window(self) -> int:
+        return max(series.span for series in self._series)
+
+    def _load(self, data: bytes | None) -> None:
+        if data is None:
+            return
+        series = self._parse(data)
+        if series is not None:
+            self._series = series
+
+    def _dump(self) -> bytes:
+        with self._lock:
+            return b"".join(series.dump() for series in self._series)
+
+    def record(self, timestamp: float, n: int = 1) -> None:
+        with self._lock:
+            for series in self._series:
+                series.add(timestamp, n)
+
+    def query(
+        self, window: int, step: int, now: float | None = None
+    ) -> list[tuple[int, int]]:
+        """Return ``(bucket_start, visits)`` pairs covering the last ``window``.
+
+        Reads the coarsest ring whose step divides ``step`` and which still
+        spans ``window``; raises ``ValueError`` if no ring can serve it.
+        """
+        candidates = [
+            series
+            for series in self._series
+            if step % series.step == 0 and series.span >= window
+        ]
+        if not candidates:
+            raise ValueError(
+                f"window must be at most {self.max_window}s and step a multiple "
+                f"of the ring resolution"
+            )
+        series = max(candidates, key=lambda s: s.step)
+        index = self._series.index(series)
+        peers = self._peer_series()
+        peer = peers[index] if peers is not None else None
+        per_point = step // series.step
+        if now is None:
+            now = time.time()
+        end = int(now // step) * step + step
+        start = end - (window + step - 1) // step * step
+
+        points = []
+        with self._lock:
+            for point_start in range(start, end, step):
+                first = point_start // series.step
+                buckets = range(first, first + per_point)
+                visits = sum(series.count(bucket) for bucket in buckets)
+                if peer is not None:
+                    visits += sum(peer.count(bucket) for bucket in buckets)
+                points.append((point_start, visits))
+        return points
+
+    def close(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+
+_history: VisitsHistory | None = None
+
+
+def get_visits_history() -> VisitsHistory:
+    global _history
+    if _history is None:
+        visits_file = Path(settings.visits_file)
+        _history = VisitsHistory(
+            visits_file.with_name(f"{visits_file.name}.history"),
+            snapshot_interval_s=settings.visits_snapshot_interval_s,
+            shard=snapshot_shard(),
+            cache_ttl_ms=settings.visits_shard_cache_ttl_ms,
+        )
+    return _history
+
+
+def close_visits_history() -> None:
+    """Snapshot and release the shared history, if it was ever created."""
+    global _history
+    if _history is not None:
+        _history.close()
+        _history = None
+
+
+VisitsHistoryDep = Annotated[VisitsHistory, Depends(get_visits_history)]
@@ -1,5 +1,30 @@
+from datetime import datetime
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class VisitsResponse(BaseModel):
     visits: int
+    unique_visitors: int
+
+
+class VisitsPoint(BaseModel):
+    timestamp: datetime
+    visits: int
+
+
+class VisitsHistoryResponse(BaseModel):
+    window_seconds: int
+    step_seconds: int
+    points: list[VisitsPoint]
+
+
+class TopEntry(BaseModel):
+    value: str
+    count: int
+
+
+class TopResponse(BaseModel):
+    by: Literal["user_agent", "client_ip"]
+    entries: list[TopEntry]
@@ -0,0 +1,156 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Annotated, Literal
+
+from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from metrics import (
+    visits_increments_blocked,
+    visits_increments_dropped,
+    visits_queue_depth,
+)
+
+from .history import VisitsHistory, get_visits_history
+from .service import VisitsCounter, get_visits_counter
+from .top import TopTalkers, get_top_talkers
+from .unique import UniqueVisitors, get_unique_visitors
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Visit:
+    client_ip: str
+    user_agent: str
+    timestamp: float = field(default_factory=time.time)
+
+
+class VisitsRecorder:
+    """Applies visits to the counter and the visit statistics.
+
+    In ``queued`` mode visits go into a bounded queue drained by a worker
+    thread, which coalesces whatever is queued into a single
+    ``counter.increment(n)``. When the queue is full the ``overflow`` policy
+    either drops the visit or waits (in the threadpool, never on the event
+    loop) for room. ``sync`` mode applies visits inline, so a following
+    ``GET /visits/`` always sees the visit.
+    """
+
+    def __init__(
+        self,
+        counter: VisitsCounter,
+        history: VisitsHistory,
+        unique: UniqueVisitors,
+        top_talkers: TopTalkers,
+        mode: Literal["sync", "queued"] = "queued",
+        queue_size: int = 10_000,
+        overflow: Literal["block", "drop"] = "block",
+    ):
+        self._counter = counter
+        self._history = history
+        self._unique = unique
+        self._top_talkers = top_talkers
+        self._mode = mode
+        self._overflow = overflow
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._worker: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._mode != "queued" or self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._run, name="visits-recorder", daemon=True
+        )
+        self._worker.start()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            visits_queue_depth.set(self._queue.qsize())
+            stop = _STOP in batch
+            visits = [item for item in batch if item is not _STOP]
+            if not visits:
+                continue
+            try:
+                self._apply(visits)
+            except Exception:
+                # Keep draining: a dead worker would leave the queue full and
+                # every blocked record() waiting forever.
+                logger.exception("Failed to apply %d visits", len(visits))
+
+    def _apply(self, visits: list[Visit]) -> None:
+        try:
+            self._counter.increment(len(visits))
+        except Exception:
+            logger.exception("Failed to apply %d visit increments", len(visits))
+        for visit in visits:
+            self._history.record(visit.timestamp)
+            self._unique.add(visit.client_ip)
+            self._top_talkers.add(visit.user_agent, visit.client_ip)
+
+    async def record(self, client_ip: str, user_agent: str) -> None:
+        visit = Visit(client_ip, user_agent)
+        if self._mode == "sync":
+            self._apply([visit])
+            return
+
+        try:
+            self._queue.put_nowait(visit)
+            visits_queue_depth.set(self._queue.qsize())
+        except queue.Full:
+            if self._overflow == "drop":
+                visits_increments_dropped.inc()
+                return
+            visits_increments_blocked.inc()
+            await run_in_threadpool(self._queue.put, visit)
+
+    def close(self) -> None:
+        """Apply everything still queued and stop the worker."""
+        if self._worker is None:
+            return
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
+        self._worker = None
+
+
+_recorder: VisitsRecorder | None = None
+
+
+def get_visits_recorder() -> VisitsRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = VisitsRecorder(
+            get_visits_counter(),
+            get_visits_history(),
+            get_unique_visitors(),
+            get_top_talkers(),
+            mode=settings.visits_increment_mode,
+            queue_size=settings.visits_queue_size,
+            overflow=settings.visits_queue_overflow,
+        )
+    return _recorder
+
+
+def close_visits_recorder() -> None:
+    """Drain and stop the shared recorder, if it was ever created."""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+VisitsRecorderDep = Annotated[VisitsRecorder, Depends(get_visits_recorder)]
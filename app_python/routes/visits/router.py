@@ -1,12 +1,84 @@
-from fastapi import APIRouter
+from datetime import UTC, datetime
+from typing import Annotated
 
-from .models import VisitsResponse
+from fastapi import APIRouter, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+
+from etag import make_etag
+from responses import DefaultJSONResponse
+
+from .history import VisitsHistoryDep
+from .models import (
+    TopEntry,
+    TopResponse,
+    VisitsHistoryResponse,
+    VisitsPoint,
+    VisitsResponse,
+)
 from .service import VisitsCounterDep
+from .top import TopBy, TopTalkersDep
+from .unique import UniqueVisitorsDep
+
+visits_router = APIRouter(prefix="/visits", default_response_class=DefaultJSONResponse)
 
-visits_router = APIRouter(prefix="/visits")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+Duration = Annotated[str, Query(pattern=r"^[1-9][0-9]*[smhd]$")]
+
+
+def _parse_duration(value: str) -> int:
+    return int(value[:-1]) * _DURATION_UNITS[value[-1]]
 
 
 @visits_router.get("/")
-async def get_visits(counter: VisitsCounterDep) -> VisitsResponse:
-    """Return the current visit count."""
-    return VisitsResponse(visits=counter.get())
+async def get_visits(
+    response: Response, counter: VisitsCounterDep, unique: UniqueVisitorsDep
+) -> VisitsResponse:
+    """Return the current visit count and estimated unique visitors."""
+
+    def read() -> VisitsResponse:
+        return VisitsResponse(visits=counter.get(), unique_visitors=unique.count())
+
+    # Both may read files, a database or the network; keep that off the loop.
+    visits = await run_in_threadpool(read)
+    response.headers["ETag"] = make_etag(f"{visits.visits}-{visits.unique_visitors}")
+    return visits
+
+
+@visits_router.get("/history")
+async def get_visits_history(
+    history: VisitsHistoryDep, window: Duration = "1h", step: Duration = "1m"
+) -> VisitsHistoryResponse:
+    """Return visits per ``step`` over the last ``window`` (e.g. 1h / 1m)."""
+    window_seconds = _parse_duration(window)
+    step_seconds = _parse_duration(step)
+    if step_seconds > window_seconds:
+        raise HTTPException(status_code=422, detail="step must not exceed window")
+    try:
+        # May re-read the other writers' snapshots; keep that off the loop.
+        points = await run_in_threadpool(history.query, window_seconds, step_seconds)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return VisitsHistoryResponse(
+        window_seconds=window_seconds,
+        step_seconds=step_seconds,
+        points=[
+            VisitsPoint(timestamp=datetime.fromtimestamp(start, UTC), visits=visits)
+            for start, visits in points
+        ],
+    )
+
+
+@visits_router.get("/top")
+async def get_top_visitors(
+    top_talkers: TopTalkersDep,
+    by: TopBy = "user_agent",
+    k: Annotated[int, Query(ge=1, le=1000)] = 20,
+) -> TopResponse:
+    """Return the heaviest user agents or client IPs among visits."""
+    return TopResponse(
+        by=by,
+        entries=[
+            TopEntry(value=value, count=count)
+            for value, count in top_talkers.top(by, k)
+        ],
+    )
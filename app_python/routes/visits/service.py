@@ -1,44 +1,162 @@
 import logging
 import threading
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Literal
 
 from fastapi import Depends
 
-from config import settings
+from config import Settings, settings
+
+from .storage import (
+    FileStore,
+    LogStore,
+    MmapStore,
+    RedisStore,
+    ShardedStore,
+    SQLiteStore,
+    VisitsStore,
+)
 
 logger = logging.getLogger(__name__)
 
+Durability = Literal["none", "interval", "fsync-every-write"]
+
 
 class VisitsCounter:
-    def __init__(self, file_path: Path):
-        self._file_path = file_path
+    """Visits counter that batches increments in memory in front of a store.
+
+    The ``durability`` mode decides when pending increments reach ``store``:
+
+    - ``none``: only on :meth:`flush` / :meth:`close` (i.e. app shutdown).
+    - ``interval``: write-behind; a background thread persists them every
+      ``flush_interval_ms`` or as soon as ``flush_every`` increments pile up.
+    - ``fsync-every-write``: every increment is persisted and fsync'ed before
+      ``increment()`` returns.
+    """
+
+    def __init__(
+        self,
+        store: VisitsStore,
+        durability: Durability = "interval",
+        flush_interval_ms: int = 1000,
+        flush_every: int = 100,
+    ):
+        self._store = store
+        self._durability = durability
+        self._flush_interval = flush_interval_ms / 1000
+        self._flush_every = flush_every
         self._lock = threading.Lock()
-        self._file_path.parent.mkdir(parents=True, exist_ok=True)
-
-    def _read(self) -> int:
-        try:
-            return int(self._file_path.read_text().strip() or "0")
-        except FileNotFoundError:
-            return 0
-        except ValueError:
-            logger.warning("Invalid visits file content, resetting to 0")
-            return 0
-
-    def _write(self, value: int) -> None:
-        tmp = self._file_path.with_suffix(".tmp")
-        tmp.write_text(str(value))
-        tmp.replace(self._file_path)
+        self._flush_lock = threading.Lock()
+
+        self._base = store.read()
+        self._pending = 0
+
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._flusher: threading.Thread | None = None
+        if durability == "interval":
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="visits-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush visits counter")
 
     def get(self) -> int:
-        with self._lock:
-            return self._read()
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending
+            return self._store.read() + pending
+
+    def increment(self, n: int = 1) -> int:
+        if self._durability == "fsync-every-write":
+            with self._flush_lock:
+                return self._store.add(n, fsync=True)
 
-    def increment(self) -> int:
         with self._lock:
-            value = self._read() + 1
-            self._write(value)
-            return value
+            self._pending += n
+            pending = self._pending
+            value = self._base + pending
+        if pending >= self._flush_every:
+            self._wakeup.set()
+        return value
+
+    def flush(self) -> None:
+        """Hand pending increments to the store."""
+        with self._flush_lock:
+            with self._lock:
+                delta = self._pending
+            if not delta:
+                return
+            total = self._store.add(
+                delta, fsync=self._durability == "fsync-every-write"
+            )
+            with self._lock:
+                self._pending -= delta
+                self._base = total
+
+    def close(self) -> None:
+        """Stop the background flusher, persist the rest and close the store."""
+        self._closed.set()
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        self._store.close()
+
+
+def build_store(config: Settings = settings) -> VisitsStore:
+    """Create the store selected by ``config.visits_storage``."""
+    visits_file = Path(config.visits_file)
+    if config.visits_storage == "log":
+        return LogStore(
+            visits_file.with_name(f"{visits_file.name}.log"),
+            segment_bytes=config.visits_log_segment_bytes,
+            legacy_file=visits_file,
+        )
+    if config.visits_storage == "mmap":
+        return MmapStore(
+            visits_file.with_name(f"{visits_file.name}.mmap"), legacy_file=visits_file
+        )
+    if config.visits_storage == "sharded":
+        return ShardedStore(
+            visits_file.with_name(f"{visits_file.name}.shards"),
+            shard=config.pod_name,
+            cache_ttl_ms=config.visits_shard_cache_ttl_ms,
+            legacy_file=visits_file,
+        )
+    if config.visits_storage == "sqlite":
+        return SQLiteStore(
+            visits_file.with_name(f"{visits_file.name}.sqlite3"),
+            pool_size=config.visits_sqlite_pool_size,
+            synchronous=(
+                "FULL" if config.visits_durability == "fsync-every-write" else "NORMAL"
+            ),
+            legacy_file=visits_file,
+        )
+    if config.visits_storage == "redis":
+        return RedisStore(
+            config.visits_redis_url,
+            key=config.visits_redis_key,
+            pool_size=config.visits_redis_pool_size,
+        )
+    return FileStore(visits_file)
+
+
+def build_counter(config: Settings = settings) -> VisitsCounter:
+    return VisitsCounter(
+        build_store(config),
+        durability=config.visits_durability,
+        flush_interval_ms=config.visits_flush_interval_ms,
+        flush_every=config.visits_flush_every,
+    )
 
 
 _counter: VisitsCounter | None = None
@@ -47,8 +165,16 @@ _counter: VisitsCounter | None = None
 def get_visits_counter() -> VisitsCounter:
     global _counter
     if _counter is None:
-        _counter = VisitsCounter(Path(settings.visits_file))
+        _counter = build_counter()
     return _counter
 
 
+def close_visits_counter() -> None:
+    """Flush and release the shared counter, if it was ever created."""
+    global _counter
+    if _counter is not None:
+        _counter.close()
+        _counter = None
+
+
 VisitsCounterDep = Annotated[VisitsCounter, Depends(get_visits_counter)]
@@ -0,0 +1,174 @@
+import fcntl
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_shard(config: Settings = settings) -> str:
+    """Suffix naming the snapshot files this process owns.
+
+    Pods sharing a volume are told apart by ``POD_NAME`` (as in
+    ``ShardedStore``); with ``WORKERS`` > 1 the pid is added as well, since
+    every worker of a pod keeps its own in-memory state.
+    """
+    if config.workers > 1:
+        return f"{config.pod_name}-{os.getpid()}"
+    return config.pod_name
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+class PeriodicSnapshot:
+    """Atomically writes ``dump()`` to ``file_path`` periodically and on close.
+
+    ``interval_s <= 0`` disables the background thread; :meth:`close` still
+    writes a final snapshot.
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        dump: Callable[[], bytes],
+        interval_s: int,
+        name: str,
+    ):
+        self._file_path = file_path
+        self._dump = dump
+        self._name = name
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+        if interval_s > 0:
+            self._thread = threading.Thread(
+                target=self._loop, args=(interval_s,), name=name, daemon=True
+            )
+            self._thread.start()
+
+    def _loop(self, interval: int) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Failed to write snapshot", extra={"name": self._name})
+
+    def write(self) -> None:
+        write_atomic(self._file_path, self._dump())
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+
+# Combines two snapshots: the accumulated one (None if there is none yet) and
+# another writer's. Returns the first unchanged if the second is unreadable.
+Merge = Callable[[bytes | None, bytes], bytes | None]
+
+
+class SharedSnapshot:
+    """Snapshots of several writers (workers, pods) sharing ``base`` on a volume.
+
+    Each writer periodically snapshots its own state to ``<base>.<shard>``;
+    readers combine ``base`` with every other writer's file. A writer folds
+    its file into ``base`` (with ``merge``) on close, and a file left behind
+    by a crashed run of the same shard on startup. Files not rewritten for
+    three snapshot intervals belong to writers that are gone and are folded
+    by whoever reads them, so old snapshots are kept without piling up
+    files. Folds hold an ``flock`` on ``<base>.lock``.
+
+    Without a ``shard`` the writer owns ``base`` itself and nothing is folded.
+    """
+
+    def __init__(
+        self,
+        base: Path,
+        shard: str | None,
+        dump: Callable[[], bytes],
+        merge: Merge,
+        interval_s: int,
+        name: str,
+    ):
+        self.base = base
+        self.own_path = base.with_name(f"{base.name}.{shard}") if shard else base
+        self._merge = merge
+        self._stale_after = 3 * interval_s if interval_s > 0 else 0
+        if self.shared:
+            self._fold([self.own_path])
+        self._snapshot = PeriodicSnapshot(self.own_path, dump, interval_s, name)
+
+    @property
+    def shared(self) -> bool:
+        return self.own_path != self.base
+
+    def read_own(self) -> bytes | None:
+        """State to restore on startup; shared writers always start empty."""
+        return None if self.shared else _read(self.own_path)
+
+    def _peer_paths(self) -> list[Path]:
+        paths = [self.base, *self.base.parent.glob(f"{self.base.name}.*")]
+        return [
+            path
+            for path in paths
+            if path != self.own_path and path.suffix not in (".tmp", ".lock")
+        ]
+
+    def _is_stale(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime > self._stale_after
+        except FileNotFoundError:
+            return False
+
+    def _fold(self, paths: list[Path]) -> None:
+        lock_path = self.base.with_name(f"{self.base.name}.lock")
+        with lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            data = _read(self.base)
+            folded = []
+            for path in paths:
+                extra = _read(path)
+                if extra is None:
+                    continue  # folded by another process meanwhile
+                data = self._merge(data, extra)
+                folded.append(path)
+            if not folded:
+                return
+            if data is not None:
+                write_atomic(self.base, data)
+            for path in folded:
+                path.unlink(missing_ok=True)
+        logger.info(
+            "Folded snapshots into %s", self.base.name, extra={"files": len(folded)}
+        )
+
+    def read_peers(self) -> list[bytes]:
+        """Snapshots of every other writer, folding those that are gone."""
+        paths = self._peer_paths()
+        if self.shared:
+            stale = [p for p in paths if p != self.base and self._is_stale(p)]
+            if stale:
+                self._fold(stale)
+                paths = [p for p in paths if p not in stale]
+        return [data for data in map(_read, paths) if data is not None]
+
+    def close(self) -> None:
+        self._snapshot.close()
+        if self.shared:
+            self._fold([self.own_path])
@@ -0,0 +1,17 @@
+from .base import VisitsStore
+from .file import FileStore
+from .log import LogStore
+from .mmap_file import MmapStore
+from .redis import RedisStore
+from .sharded import ShardedStore
+from .sqlite import SQLiteStore
+
+__all__ = [
+    "VisitsStore",
+    "FileStore",
+    "LogStore",
+    "MmapStore",
+    "ShardedStore",
+    "SQLiteStore",
+    "RedisStore",
+]
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+
+class VisitsStore(ABC):
+    """Persistence engine behind ``VisitsCounter``.
+
+    Stores only ever see batched deltas: the counter decides *when* to persist
+    (see ``visits_durability``), the store decides *how*.
+    """
+
+    @abstractmethod
+    def read(self) -> int:
+        """Return the persisted total."""
+
+    @abstractmethod
+    def add(self, delta: int, fsync: bool = False) -> int:
+        """Persist ``delta`` more visits and return the new total."""
+
+    def close(self) -> None:  # noqa: B027
+        """Release files, threads or connections held by the store."""
@@ -0,0 +1,57 @@
+import logging
+import os
+import threading
+from pathlib import Path
+
+from .base import VisitsStore
+
+logger = logging.getLogger(__name__)
+
+
+def fsync_dir(path: Path) -> None:
+    dir_fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+class FileStore(VisitsStore):
+    """Plain-text total, rewritten atomically (tmp file + rename) on each add."""
+
+    def __init__(self, file_path: Path):
+        self._file_path = file_path
+        self._lock = threading.Lock()
+        self._file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._value = self._read()
+
+    def _read(self) -> int:
+        try:
+            return int(self._file_path.read_text().strip() or "0")
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            logger.warning("Invalid visits file content, resetting to 0")
+            return 0
+
+    def _write(self, value: int, fsync: bool = False) -> None:
+        tmp = self._file_path.with_suffix(".tmp")
+        with tmp.open("w") as f:
+            f.write(str(value))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        tmp.replace(self._file_path)
+        if fsync:
+            fsync_dir(self._file_path.parent)
+
+    def read(self) -> int:
+        with self._lock:
+            return self._value
+
+    def add(self, delta: int, fsync: bool = False) -> int:
+        with self._lock:
+            value = self._value + delta
+            self._write(value, fsync=fsync)
+            self._value = value
+            return value
@@ -0,0 +1,191 @@
+import logging
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+from .base import VisitsStore
+from .file import FileStore, fsync_dir
+
+logger = logging.getLogger(__name__)
+
+# Fixed-size increment record: delta (u64) followed by crc32(delta).
+_RECORD = struct.Struct("<QI")
+_SNAPSHOT = "snapshot"
+_SEGMENT_SUFFIX = ".log"
+
+
+def _encode(delta: int) -> bytes:
+    payload = delta.to_bytes(8, "little")
+    return _RECORD.pack(delta, zlib.crc32(payload))
+
+
+class LogStore(VisitsStore):
+    """Append-only segment log with background compaction into a snapshot.
+
+    Every add appends one 12-byte record to the active segment. Once a segment
+    grows past ``segment_bytes`` it is sealed, a new one is started, and a
+    background thread folds the sealed segments into ``snapshot`` (written
+    atomically) before deleting them. On startup the total is rebuilt from the
+    snapshot plus every segment newer than it; a torn trailing record left by
+    a crash is detected by its checksum and truncated away.
+
+    An empty log is seeded from ``legacy_file`` (the plain-text total written
+    by ``FileStore``), so switching an existing volume to this engine keeps
+    its count.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = 1024 * 1024,
+        legacy_file: Path | None = None,
+    ):
+        self._dir = directory
+        self._segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._dir.mkdir(parents=True, exist_ok=True)
+        if legacy_file is not None:
+            self._seed(legacy_file)
+
+        self._snapshot_seq, self._value = self._read_snapshot()
+        self._seq = self._snapshot_seq
+        for seq, path in self._segments():
+            if seq <= self._snapshot_seq:
+                continue
+            self._value += self._replay(path)
+            self._seq = seq
+
+        # Segments replayed at startup are sealed right away: appends always
+        # go to a fresh segment and the compactor folds the old ones.
+        self._sealed = (self._seq, self._value)
+        self._seq += 1
+        self._fd, self._size = self._open_segment(self._seq)
+
+        self._compact_wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._compactor = threading.Thread(
+            target=self._compact_loop, name="visits-compactor", daemon=True
+        )
+        self._compactor.start()
+        if self._sealed[0] > self._snapshot_seq:
+            self._compact_wakeup.set()
+
+    def _segment_path(self, seq: int) -> Path:
+        return self._dir / f"{seq:010d}{_SEGMENT_SUFFIX}"
+
+    def _segments(self) -> list[tuple[int, Path]]:
+        segments = []
+        for path in self._dir.glob(f"*{_SEGMENT_SUFFIX}"):
+            try:
+                segments.append((int(path.stem), path))
+            except ValueError:
+                logger.warning("Ignoring unexpected file in visits log: %s", path)
+        return sorted(segments)
+
+    def _seed(self, legacy_file: Path) -> None:
+        if (self._dir / _SNAPSHOT).exists() or self._segments():
+            return
+        value = FileStore(legacy_file).read()
+        if value:
+            logger.info(
+                "Seeding visits log from %s", legacy_file, extra={"visits": value}
+            )
+            self._write_snapshot(0, value)
+
+    def _write_snapshot(self, seq: int, value: int) -> None:
+        tmp = self._dir / f"{_SNAPSHOT}.tmp"
+        with tmp.open("w") as f:
+            f.write(f"{seq} {value}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self._dir / _SNAPSHOT)
+        fsync_dir(self._dir)
+
+    def _read_snapshot(self) -> tuple[int, int]:
+        try:
+            seq, value = (self._dir / _SNAPSHOT).read_text().split()
+            return int(seq), int(value)
+        except FileNotFoundError:
+            return 0, 0
+        except ValueError:
+            logger.warning("Invalid visits snapshot, replaying log from scratch")
+            return 0, 0
+
+    def _replay(self, path: Path) -> int:
+        data = path.read_bytes()
+        total = 0
+        valid = 0
+        for offset in range(0, len(data) - _RECORD.size + 1, _RECORD.size):
+            delta, crc = _RECORD.unpack_from(data, offset)
+            if zlib.crc32(delta.to_bytes(8, "little")) != crc:
+                break
+            total += delta
+            valid = offset + _RECORD.size
+        if valid != len(data):
+            logger.warning(
+                "Truncating torn visits log record",
+                extra={"segment": path.name, "bytes": len(data) - valid},
+            )
+            os.truncate(path, valid)
+        return total
+
+    def _open_segment(self, seq: int) -> tuple[int, int]:
+        path = self._segment_path(seq)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return fd, os.fstat(fd).st_size
+
+    def _rotate(self) -> None:
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._sealed = (self._seq, self._value)
+        self._seq += 1
+        self._fd, self._size = self._open_segment(self._seq)
+        fsync_dir(self._dir)
+        self._compact_wakeup.set()
+
+    def _compact_loop(self) -> None:
+        while not self._closed.is_set():
+            self._compact_wakeup.wait()
+            self._compact_wakeup.clear()
+            try:
+                self.compact()
+            except OSError:
+                logger.exception("Failed to compact visits log")
+
+    def compact(self) -> None:
+        """Fold every sealed segment into the snapshot and delete them."""
+        with self._lock:
+            seq, value = self._sealed
+        if seq <= self._snapshot_seq:
+            return
+        self._write_snapshot(seq, value)
+        self._snapshot_seq = seq
+        for segment_seq, path in self._segments():
+            if segment_seq <= seq:
+                path.unlink(missing_ok=True)
+
+    def read(self) -> int:
+        with self._lock:
+            return self._value
+
+    def add(self, delta: int, fsync: bool = False) -> int:
+        record = _encode(delta)
+        with self._lock:
+            os.write(self._fd, record)
+            if fsync:
+                os.fsync(self._fd)
+            self._size += len(record)
+            self._value += delta
+            if self._size >= self._segment_bytes:
+                self._rotate()
+            return self._value
+
+    def close(self) -> None:
+        self._closed.set()
+        self._compact_wakeup.set()
+        self._compactor.join()
+        with self._lock:
+            os.fsync(self._fd)
+            os.close(self._fd)
@@ -0,0 +1,62 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .base import VisitsStore
+from .file import FileStore
+
+_SLOT = struct.Struct("<Q")
+
+
+class MmapStore(VisitsStore):
+    """Single 8-byte counter slot shared by every process mapping ``file_path``.
+
+    Adds are a fetch-add on the mapped slot under an ``fcntl`` byte-range lock,
+    so any number of uvicorn workers can share one file without rereading or
+    rewriting it. The in-process lock is still needed because ``fcntl`` locks
+    are owned by the process, not the thread.
+
+    A newly created slot starts from the total in ``legacy_file`` (written by
+    ``FileStore``), so switching an existing volume to mmap keeps its count.
+    """
+
+    def __init__(self, file_path: Path, legacy_file: Path | None = None):
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fd = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked(fcntl.LOCK_EX):
+            if os.fstat(self._fd).st_size < _SLOT.size:
+                seed = FileStore(legacy_file).read() if legacy_file else 0
+                os.pwrite(self._fd, _SLOT.pack(seed), 0)
+        self._mm = mmap.mmap(self._fd, _SLOT.size)
+
+    @contextmanager
+    def _locked(self, mode: int) -> Iterator[None]:
+        fcntl.lockf(self._fd, mode, _SLOT.size, 0)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _SLOT.size, 0)
+
+    def read(self) -> int:
+        with self._lock, self._locked(fcntl.LOCK_SH):
+            return _SLOT.unpack_from(self._mm)[0]
+
+    def add(self, delta: int, fsync: bool = False) -> int:
+        with self._lock, self._locked(fcntl.LOCK_EX):
+            value = _SLOT.unpack_from(self._mm)[0] + delta
+            _SLOT.pack_into(self._mm, 0, value)
+            if fsync:
+                self._mm.flush()
+            return value
+
+    def close(self) -> None:
+        with self._lock:
+            self._mm.flush()
+            self._mm.close()
+            os.close(self._fd)
@@ -0,0 +1,145 @@
+import logging
+import queue
+import socket
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from .base import VisitsStore
+
+logger = logging.getLogger(__name__)
+
+
+class RedisError(Exception):
+    """Error reply sent by the server."""
+
+
+class RespConnection:
+    """Blocking connection speaking RESP2, the Redis wire protocol."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+
+    @staticmethod
+    def _encode(*args: str | int) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from server: {line!r}")
+
+    def execute(self, *args: str | int):
+        self._sock.sendall(self._encode(*args))
+        return self._read_reply()
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+
+class RedisStore(VisitsStore):
+    """Counter key on a Redis-protocol server shared by every replica.
+
+    Each flush is a single ``INCRBY`` with the coalesced delta, sent over a
+    pooled connection. Broken connections are dropped from the pool and
+    reopened on the next call; the counter keeps the delta pending meanwhile.
+    While the server is unreachable, reads return the last total seen, so
+    startup and ``GET /visits/`` keep working.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key: str = "visits",
+        pool_size: int = 4,
+        timeout: float = 1.0,
+    ):
+        parsed = urlparse(url)
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._password = parsed.password
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._timeout = timeout
+        self._key = key
+        self._pool: queue.LifoQueue[RespConnection | None] = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(None)
+        self._pool_size = pool_size
+        self._last = 0
+        self._reachable = True
+
+    def _connect(self) -> RespConnection:
+        conn = RespConnection(self._host, self._port, self._timeout)
+        if self._password:
+            conn.execute("AUTH", self._password)
+        if self._db:
+            conn.execute("SELECT", self._db)
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[RespConnection]:
+        conn = self._pool.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            yield conn
+        except (OSError, ValueError):
+            if conn is not None:
+                conn.close()
+            conn = None
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def read(self) -> int:
+        try:
+            with self._connection() as conn:
+                self._last = int(conn.execute("GET", self._key) or 0)
+        except (OSError, ValueError) as exc:
+            if self._reachable:
+                logger.warning(
+                    "Redis unreachable, serving last known visits total",
+                    extra={"error": str(exc)},
+                )
+            self._reachable = False
+            return self._last
+        self._reachable = True
+        return self._last
+
+    def add(self, delta: int, fsync: bool = False) -> int:
+        with self._connection() as conn:
+            self._last = conn.execute("INCRBY", self._key, delta)
+        self._reachable = True
+        return self._last
+
+    def close(self) -> None:
+        for _ in range(self._pool_size):
+            conn = self._pool.get()
+            if conn is not None:
+                conn.close()
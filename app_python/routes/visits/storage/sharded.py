@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+from pathlib import Path
+
+from .base import VisitsStore
+from .file import FileStore
+
+logger = logging.getLogger(__name__)
+
+_SHARD_SUFFIX = ".count"
+_LEGACY_SHARD = "legacy"
+
+
+class ShardedStore(VisitsStore):
+    """One shard file per pod in a shared directory, summed on read.
+
+    Each replica only ever writes ``<shard>.count`` (through a ``FileStore``),
+    so writers on a shared RWX volume never contend. Reads add up every other
+    shard, cached for ``cache_ttl_ms`` so ``GET /visits/`` does not list and
+    read the directory on every call.
+
+    When the directory has no shards yet, the total in ``legacy_file``
+    (written by ``FileStore``) is imported once as a ``legacy`` shard, so
+    switching an existing volume to sharded storage keeps its count.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        shard: str,
+        cache_ttl_ms: int = 1000,
+        legacy_file: Path | None = None,
+    ):
+        self._dir = directory
+        self._shard = shard
+        self._cache_ttl = cache_ttl_ms / 1000
+        self._lock = threading.Lock()
+        self._own = FileStore(directory / f"{shard}{_SHARD_SUFFIX}")
+        if legacy_file is not None:
+            self._seed(legacy_file)
+        self._others = 0
+        self._expires_at = 0.0
+
+    def _seed(self, legacy_file: Path) -> None:
+        if any(self._dir.glob(f"*{_SHARD_SUFFIX}")):
+            return
+        value = FileStore(legacy_file).read()
+        if value:
+            logger.info(
+                "Seeding visits shards from %s", legacy_file, extra={"visits": value}
+            )
+            FileStore(self._dir / f"{_LEGACY_SHARD}{_SHARD_SUFFIX}").add(
+                value, fsync=True
+            )
+
+    def _read_shard(self, path: Path) -> int:
+        try:
+            return int(path.read_text().strip() or "0")
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            logger.warning("Invalid visits shard content", extra={"shard": path.name})
+            return 0
+
+    def _other_shards(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._expires_at:
+                self._others = sum(
+                    self._read_shard(path)
+                    for path in self._dir.glob(f"*{_SHARD_SUFFIX}")
+                    if path.stem != self._shard
+                )
+                self._expires_at = now + self._cache_ttl
+            return self._others
+
+    def read(self) -> int:
+        return self._own.read() + self._other_shards()
+
+    def add(self, delta: int, fsync: bool = False) -> int:
+        return self._own.add(delta, fsync=fsync) + self._other_shards()
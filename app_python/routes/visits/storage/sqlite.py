@@ -0,0 +1,92 @@
+import queue
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .base import VisitsStore
+from .file import FileStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared across threads."""
+
+    def __init__(self, db_path: Path, size: int, synchronous: str):
+        self._connections: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        for _ in range(size):
+            conn = sqlite3.connect(
+                db_path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={synchronous}")
+            self._connections.put(conn)
+        self._size = size
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self) -> None:
+        for _ in range(self._size):
+            self._connections.get().close()
+
+
+class SQLiteStore(VisitsStore):
+    """Counter row in an SQLite database in WAL mode.
+
+    Each add is a single autocommit ``UPDATE ... RETURNING``, so writers in
+    other processes are serialized by SQLite itself. ``synchronous`` is
+    ``NORMAL`` by default (durable up to the last WAL checkpoint); pass
+    ``FULL`` when every write must survive power loss.
+
+    The counter row is created with the total in ``legacy_file`` (written by
+    ``FileStore``), so switching an existing volume to SQLite keeps its count.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        name: str = "visits",
+        pool_size: int = 4,
+        synchronous: str = "NORMAL",
+        legacy_file: Path | None = None,
+    ):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._name = name
+        self._pool = ConnectionPool(db_path, pool_size, synchronous)
+        seed = FileStore(legacy_file).read() if legacy_file is not None else 0
+        with self._pool.connection() as conn:
+            conn.execute(_SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, ?)",
+                (name, seed),
+            )
+
+    def read(self) -> int:
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM counters WHERE name = ?", (self._name,)
+            ).fetchone()
+        return row[0]
+
+    def add(self, delta: int, fsync: bool = False) -> int:
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "UPDATE counters SET value = value + ? WHERE name = ? RETURNING value",
+                (delta, self._name),
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        self._pool.close()
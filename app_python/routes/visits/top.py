@@ -0,0 +1,48 @@
+import threading
+from typing import Annotated, Literal
+
+from fastapi import Depends
+
+from config import settings
+
+from .sketches import TopK
+
+TopBy = Literal["user_agent", "client_ip"]
+
+
+class TopTalkers:
+    """Heavy-hitter user agents and client IPs among recent visits.
+
+    Memory is bounded by the sketch size and ``capacity`` candidates per
+    dimension. Kept in memory only: it is an incident view, not history.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._top: dict[TopBy, TopK] = {
+            "user_agent": TopK(capacity),
+            "client_ip": TopK(capacity),
+        }
+
+    def add(self, user_agent: str, client_ip: str) -> None:
+        with self._lock:
+            self._top["user_agent"].add(user_agent)
+            self._top["client_ip"].add(client_ip)
+
+    def top(self, by: TopBy, k: int) -> list[tuple[str, int]]:
+        with self._lock:
+            return self._top[by].top(k)
+
+
+_top_talkers: TopTalkers | None = None
+
+
+def get_top_talkers() -> TopTalkers:
+    global _top_talkers
+    if _top_talkers is None:
+        _top_talkers = TopTalkers(settings.visits_top_capacity)
+    return _top_talkers
+
+
+TopTalkersDep = Annotated[TopTalkers, Depends(get_top_talkers)]
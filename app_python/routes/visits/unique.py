@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Annotated
+
+from fastapi import Depends
+
+from config import settings
+
+from .sketches import HyperLogLog
+from .snapshot import SharedSnapshot, snapshot_shard
+
+logger = logging.getLogger(__name__)
+
+
+def _load_sketch(data: bytes | None, precision: int) -> HyperLogLog | None:
+    if data is None:
+        return None
+    try:
+        sketch = HyperLogLog.load(data)
+    except (IndexError, ValueError):
+        logger.warning("Invalid unique visitors snapshot, ignoring it")
+        return None
+    return sketch if sketch.precision == precision else None
+
+
+class UniqueVisitors:
+    """Approximate count of distinct client IPs, backed by a HyperLogLog.
+
+    Memory stays at a few KiB however many clients show up. The sketch is
+    snapshotted every ``snapshot_interval_s`` and on close to ``file_path``,
+    or to ``<file_path>.<shard>`` when a shard is given (see
+    :class:`SharedSnapshot`). Every other ``<file_path>*`` snapshot (other
+    workers and pods on the same volume) is merged into :meth:`count`,
+    re-read at most every ``cache_ttl_ms``; merging takes the register-wise
+    max, so overlapping visitors are not counted twice and folding the
+    snapshots of departed writers into ``file_path`` loses none.
+    """
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        precision: int = 12,
+        snapshot_interval_s: int = 60,
+        shard: str | None = None,
+        cache_ttl_ms: int = 1000,
+    ):
+        self._lock = threading.Lock()
+        self._peers_lock = threading.Lock()
+        self._sketch = HyperLogLog(precision)
+        self._cache_ttl = cache_ttl_ms / 1000
+        self._peers: HyperLogLog | None = None
+        self._peers_expire_at = 0.0
+        self._snapshot: SharedSnapshot | None = None
+        if file_path is not None:
+            self._snapshot = SharedSnapshot(
+                file_path,
+                shard,
+                self._dump,
+                self._merge_dumps,
+                snapshot_interval_s,
+                name="visits-unique",
+            )
+            sketch = _load_sketch(self._snapshot.read_own(), precision)
+            if sketch is not None:
+                self._sketch = sketch
+
+    def _merge_dumps(self, data: bytes | None, other: bytes) -> bytes | None:
+        extra = _load_sketch(other, self._sketch.precision)
+        if extra is None:
+            return data
+        merged = _load_sketch(data, self._sketch.precision)
+        if merged is not None:
+            extra.merge(merged)
+        return extra.dump()
+
+    def _peers_sketch(self) -> HyperLogLog | None:
+        if self._snapshot is None:
+            return None
+        with self._peers_lock:
+            now = time.monotonic()
+            if now >= self._peers_expire_at:
+                peers = None
+                for data in self._snapshot.read_peers():
+                    sketch = _load_sketch(data, self._sketch.precision)
+                    if sketch is None:
+                        continue
+                    if peers is None:
+                        peers = sketch
+                    else:
+                        peers.merge(sketch)
+                self._peers = peers
+                self._peers_expire_at = now + self._cache_ttl
+            return self._peers
+
+    def _dump(self) -> bytes:
+        with self._lock:
+            return self._sketch.dump()
+
+    def add(self, client_ip: str) -> None:
+        with self._lock:
+            self._sketch.add(client_ip)
+
+    def count(self) -> int:
+        """Distinct visitors across this process and every peer snapshot."""
+        peers = self._peers_sketch()
+        with self._lock:
+            if peers is None:
+                return self._sketch.count()
+            merged = self._sketch.copy()
+        merged.merge(peers)
+        return merged.count()
+
+    def close(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+
+_unique: UniqueVisitors | None = None
+
+
+def get_unique_visitors() -> UniqueVisitors:
+    global _unique
+    if _unique is None:
+        visits_file = Path(settings.visits_file)
+        _unique = UniqueVisitors(
+            visits_file.with_name(f"{visits_file.name}.hll"),
+            precision=settings.visits_hll_precision,
+            snapshot_interval_s=settings.visits_snapshot_interval_s,
+            shard=snapshot_shard(),
+            cache_ttl_ms=settings.visits_shard_cache_ttl_ms,
+        )
+    return _unique
+
+
+def close_unique_visitors() -> None:
+    """Snapshot and release the shared sketch, if it was ever created."""
+    global _unique
+    if _unique is not None:
+        _unique.close()
+        _unique = None
+
+
+UniqueVisitorsDep = Annotated[UniqueVisitors, Depends(get_unique_visitors)]
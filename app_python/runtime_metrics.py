@@ -0,0 +1,98 @@
+import asyncio
+import collections
+import gc
+import logging
+import os
+import time
+
+from anyio import to_thread
+
+from metrics import (
+    event_loop_lag,
+    gc_pause_duration,
+    open_fds,
+    threadpool_capacity,
+    threadpool_in_use,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _count_open_fds() -> int | None:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None  # not Linux
+
+
+class RuntimeCollector:
+    """Samples event-loop, GC, threadpool and fd health while the app runs.
+
+    A task on the event loop sleeps for ``interval_ms`` and records how late
+    it woke up as loop lag; each tick also samples the anyio threadpool and
+    open file descriptors. GC pauses are timed through ``gc.callbacks`` and
+    observed on the next tick: the callback can fire while prometheus_client
+    holds its (non-reentrant) multiprocess value lock on the same thread, so
+    it must not touch metrics itself.
+    """
+
+    def __init__(self, interval_ms: int = 500):
+        self._interval = interval_ms / 1000
+        self._task: asyncio.Task | None = None
+        self._gc_started: float | None = None
+        self._gc_pauses: collections.deque[tuple[int, float]] = collections.deque(
+            maxlen=10_000
+        )
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self._gc_pauses.append(
+                (info["generation"], time.perf_counter() - self._gc_started)
+            )
+            self._gc_started = None
+
+    def _observe_gc_pauses(self) -> None:
+        while self._gc_pauses:
+            generation, pause = self._gc_pauses.popleft()
+            gc_pause_duration.labels(generation=str(generation)).observe(pause)
+
+    def _sample(self) -> None:
+        self._observe_gc_pauses()
+        limiter = to_thread.current_default_thread_limiter()
+        threadpool_in_use.set(limiter.borrowed_tokens)
+        threadpool_capacity.set(limiter.total_tokens)
+        fds = _count_open_fds()
+        if fds is not None:
+            open_fds.set(fds)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self._interval)
+            event_loop_lag.observe(max(0.0, loop.time() - started - self._interval))
+            try:
+                self._sample()
+            except Exception:
+                logger.exception("Failed to sample runtime metrics")
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        gc.callbacks.append(self._on_gc)
+        self._sample()
+        self._task = asyncio.create_task(self._run(), name="runtime-metrics")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        gc.callbacks.remove(self._on_gc)
+        self._observe_gc_pauses()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
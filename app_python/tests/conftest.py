@@ -15,16 +15,44 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app import app
+from exposition import MetricsExposition, get_metrics_exposition
+from routes.visits.history import VisitsHistory, get_visits_history
+from routes.visits.recorder import VisitsRecorder, get_visits_recorder
 from routes.visits.service import VisitsCounter, get_visits_counter
+from routes.visits.storage import FileStore
+from routes.visits.top import TopTalkers, get_top_talkers
+from routes.visits.unique import UniqueVisitors, get_unique_visitors
 
 
 @pytest.fixture
-def client(tmp_path):
-    """Create a test client for the FastAPI application."""
-    counter = VisitsCounter(tmp_path / "visits")
+def app_overrides(tmp_path):
+    """Point the app's dependencies at per-test state under ``tmp_path``."""
+    counter = VisitsCounter(FileStore(tmp_path / "visits"))
+    history = VisitsHistory()
+    unique = UniqueVisitors()
+    top_talkers = TopTalkers()
+    recorder = VisitsRecorder(counter, history, unique, top_talkers, mode="sync")
     app.dependency_overrides[get_visits_counter] = lambda: counter
+    app.dependency_overrides[get_visits_history] = lambda: history
+    app.dependency_overrides[get_unique_visitors] = lambda: unique
+    app.dependency_overrides[get_top_talkers] = lambda: top_talkers
+    app.dependency_overrides[get_visits_recorder] = lambda: recorder
+    exposition = MetricsExposition(min_interval_ms=0)
+    app.dependency_overrides[get_metrics_exposition] = lambda: exposition
     try:
-        with TestClient(app) as test_client:
-            yield test_client
+        yield app
     finally:
         app.dependency_overrides.pop(get_visits_counter, None)
+        app.dependency_overrides.pop(get_visits_history, None)
+        app.dependency_overrides.pop(get_unique_visitors, None)
+        app.dependency_overrides.pop(get_top_talkers, None)
+        app.dependency_overrides.pop(get_visits_recorder, None)
+        app.dependency_overrides.pop(get_metrics_exposition, None)
+        counter.close()
+
+
+@pytest.fixture
+def client(app_overrides):
+    """Create a test client for the FastAPI application."""
+    with TestClient(app_overrides) as test_client:
+        yield test_client
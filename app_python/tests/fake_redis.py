@@ -0,0 +1,71 @@
+"""Minimal in-process Redis-protocol server for tests.
+
+Supports just the commands ``RedisStore`` sends, so tests never need a real
+Redis instance.
+"""
+
+import socketserver
+import threading
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self) -> list[str] | None:
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+
+    def handle(self) -> None:
+        server: FakeRedisServer = self.server
+        while (command := self._read_command()) is not None:
+            name, *args = command
+            with server.lock:
+                server.commands.append(name.upper())
+                reply = server.dispatch(name.upper(), args)
+            self.wfile.write(reply)
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.data: dict[str, str] = {}
+        self.commands: list[str] = []
+        self.lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def dispatch(self, name: str, args: list[str]) -> bytes:
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name == "GET":
+            value = self.data.get(args[0])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value.encode())
+        if name in ("INCR", "INCRBY"):
+            delta = int(args[1]) if name == "INCRBY" else 1
+            value = int(self.data.get(args[0], "0")) + delta
+            self.data[args[0]] = str(value)
+            return b":%d\r\n" % value
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+    def __enter__(self) -> "FakeRedisServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,53 @@
+"""Smoke tests for the in-process ASGI benchmark suite."""
+
+from benchmarks.asgi_bench import compare, run_benchmark
+from benchmarks.visits_storage_bench import format_table, run_case
+
+
+def _result(rps: float, p95_ms: float) -> dict:
+    return {"endpoints": {"/": {"rps": rps, "p95_ms": p95_ms}}}
+
+
+class TestAsgiBench:
+    async def test_reports_throughput_latency_and_allocations(self, app_overrides):
+        results = await run_benchmark(
+            app_overrides,
+            ("/health/",),
+            requests=20,
+            concurrency=4,
+            rounds=1,
+            warmup=2,
+            alloc_requests=5,
+        )
+        health = results["endpoints"]["/health/"]
+        assert health["rps"] > 0
+        assert health["p50_ms"] <= health["p95_ms"] <= health["p99_ms"]
+        assert health["alloc_peak_bytes"] > 0
+
+    def test_compare_flags_regressions_past_threshold(self):
+        baseline = _result(rps=1000, p95_ms=10)
+        assert compare(_result(rps=950, p95_ms=10.5), baseline, 0.1) == []
+        assert len(compare(_result(rps=800, p95_ms=12), baseline, 0.1)) == 2
+
+
+class TestVisitsStorageBench:
+    def test_shared_store_loses_nothing_across_processes(self, tmp_path):
+        result = run_case("mmap", "interval", "disk", tmp_path, 2, 2, ops=50)
+        assert result.error is None
+        assert result.lost == 0
+        assert result.increments_per_s > 0
+        assert result.p50_us <= result.p99_us
+
+    def test_per_process_file_store_reports_lost_updates(self, tmp_path):
+        result = run_case("file", "interval", "disk", tmp_path, 2, 1, ops=50)
+        assert result.lost == 50
+        assert "| file | interval | disk | 2 x 1 |" in format_table([result])
+
+    def test_baseline_reproduces_per_hit_read_write(self, tmp_path):
+        result = run_case("baseline", "per-hit", "disk", tmp_path, 1, 2, ops=50)
+        assert result.error is None
+        assert result.lost == 0
+
+    def test_workers_of_one_pod_share_a_shard(self, tmp_path):
+        result = run_case("sharded", "interval", "disk", tmp_path, 2, 1, ops=50)
+        assert result.lost == 50
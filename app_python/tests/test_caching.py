@@ -0,0 +1,54 @@
+"""Tests for ETag / If-None-Match handling and Cache-Control policies."""
+
+from etag import etag_matches
+
+
+class TestConditionalRequests:
+    def test_root_returns_weak_etag(self, client):
+        response = client.get("/")
+        assert response.headers["etag"].startswith('W/"')
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_root_revalidates_with_304(self, client):
+        etag = client.get("/").headers["etag"]
+        response = client.get("/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_visits_etag_changes_with_count(self, client):
+        first = client.get("/visits/")
+        assert first.headers["etag"] == '"0-0"'
+        assert (
+            first.headers["cache-control"]
+            == "public, max-age=1, stale-while-revalidate=5"
+        )
+        assert (
+            client.get("/visits/", headers={"If-None-Match": '"0-0"'}).status_code
+            == 304
+        )
+
+        client.get("/")
+        response = client.get("/visits/", headers={"If-None-Match": '"0-0"'})
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"1-1"'
+
+    def test_health_is_not_stored(self, client):
+        response = client.get("/health/")
+        assert response.headers["cache-control"] == "no-store"
+
+    def test_mismatched_etag_returns_full_body(self, client):
+        response = client.get("/", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.json()["service"]["name"] == "devops-info-service"
+
+
+class TestEtagMatching:
+    def test_weak_comparison(self):
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"abc"', 'W/"abc"')
+
+    def test_list_and_wildcard(self):
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"x"', '"abc"')
@@ -0,0 +1,119 @@
+"""Tests for the debug-only profiling endpoint."""
+
+import inspect
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config import settings
+from routes.debug.router import debug_router, profile
+from routes.debug.service import (
+    SamplingProfiler,
+    acquire_profile_slot,
+    release_profile_slot,
+)
+
+
+@pytest.fixture
+def debug_client():
+    """The debug router on its own app, as mounted when DEBUG/DEBUG_TOKEN is set."""
+    app = FastAPI()
+    app.include_router(debug_router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def debug_mode(monkeypatch):
+    monkeypatch.setattr(settings, "debug", True)
+
+
+def test_not_mounted_or_advertised_by_default(client):
+    response = client.post("/debug/profile", params={"seconds": 0.05})
+    assert response.status_code == 404
+    paths = {endpoint["path"] for endpoint in client.get("/").json()["endpoints"]}
+    assert "/debug/profile" not in paths
+
+
+class TestProfileAccess:
+    def test_hidden_without_debug_or_token(self, debug_client):
+        response = debug_client.post("/debug/profile", params={"seconds": 0.05})
+        assert response.status_code == 404
+
+    def test_wrong_token_is_rejected(self, debug_client, monkeypatch):
+        monkeypatch.setattr(settings, "debug_token", "s3cret")
+        response = debug_client.post(
+            "/debug/profile",
+            params={"seconds": 0.05},
+            headers={"Authorization": "Bearer nope"},
+        )
+        assert response.status_code == 404
+
+    def test_token_grants_access(self, debug_client, monkeypatch):
+        monkeypatch.setattr(settings, "debug_token", "s3cret")
+        response = debug_client.post(
+            "/debug/profile",
+            params={"seconds": 0.05},
+            headers={"Authorization": "Bearer s3cret"},
+        )
+        assert response.status_code == 200
+
+
+class TestProfileEndpoint:
+    def test_returns_collapsed_stacks(self, debug_client, debug_mode):
+        response = debug_client.post(
+            "/debug/profile", params={"seconds": 0.2, "interval_ms": 5}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        lines = response.text.splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+
+    def test_duration_is_capped(self, debug_client, debug_mode):
+        seconds = settings.debug_profile_max_seconds + 1
+        response = debug_client.post("/debug/profile", params={"seconds": seconds})
+        assert response.status_code == 422
+
+    def test_one_profile_at_a_time(self, debug_client, debug_mode):
+        assert acquire_profile_slot()
+        try:
+            response = debug_client.post("/debug/profile", params={"seconds": 0.05})
+        finally:
+            release_profile_slot()
+        assert response.status_code == 409
+
+
+class TestSamplingProfiler:
+    def test_samples_other_threads_by_name(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=stop.wait, name="busy-worker")
+        worker.start()
+        profiler = SamplingProfiler(interval_ms=1)
+        profiler.start(max_seconds=5)
+        time.sleep(0.05)
+        stacks = profiler.stop()
+        stop.set()
+        worker.join()
+        assert any(line.startswith("busy-worker;") for line in stacks.splitlines())
+        assert "sampling-profiler" not in stacks
+
+    def test_stops_at_deadline(self):
+        profiler = SamplingProfiler(interval_ms=1)
+        profiler.start(max_seconds=0.02)
+        time.sleep(0.1)
+        samples = profiler.samples
+        time.sleep(0.05)
+        assert profiler.samples == samples
+        profiler.stop()
+
+
+def test_default_duration_fits_the_cap():
+    default = inspect.signature(profile).parameters["seconds"].default
+    assert 0 < default <= settings.debug_profile_max_seconds
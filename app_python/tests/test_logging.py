@@ -0,0 +1,110 @@
+"""Tests for the queued JSON logging pipeline."""
+
+import io
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueListener
+
+from prometheus_client import REGISTRY
+
+from log_config import BatchedStreamHandler, BoundedQueueHandler, JsonFormatter
+
+
+def _record(level: int, msg: str = "hello", **extra) -> logging.LogRecord:
+    record = logging.LogRecord("test", level, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def _dropped(level: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "devops_info_log_records_dropped_total", {"level": level}
+    )
+    return value or 0.0
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s: str) -> int:
+        self.writes += 1
+        return super().write(s)
+
+
+class TestBoundedQueueHandler:
+    def test_debug_is_dropped_before_info_and_warning(self):
+        log_queue: queue.Queue = queue.Queue(maxsize=10)
+        handler = BoundedQueueHandler(log_queue)
+        debug, info, warning = _dropped("DEBUG"), _dropped("INFO"), _dropped("WARNING")
+
+        for _ in range(6):
+            handler.handle(_record(logging.DEBUG))
+        assert log_queue.qsize() == 5
+        for _ in range(5):
+            handler.handle(_record(logging.INFO))
+        assert log_queue.qsize() == 9
+        for _ in range(2):
+            handler.handle(_record(logging.WARNING))
+        assert log_queue.qsize() == 10
+
+        assert _dropped("DEBUG") == debug + 1
+        assert _dropped("INFO") == info + 1
+        assert _dropped("WARNING") == warning + 1
+
+    def test_prepare_renders_message_and_traceback(self):
+        handler = BoundedQueueHandler(queue.Queue())
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = logging.LogRecord(
+                "test", logging.ERROR, __file__, 1, "%s failed", ("job",), True
+            )
+            record.exc_info = sys.exc_info()
+        prepared = handler.prepare(record)
+        assert prepared.msg == "job failed"
+        assert prepared.exc_info is None
+        assert "RuntimeError: boom" in prepared.exc_text
+
+
+class TestBatchedStreamHandler:
+    def test_pipeline_writes_json_lines_in_batches(self):
+        log_queue: queue.Queue = queue.Queue()
+        stream = CountingStream()
+        writer = BatchedStreamHandler(stream, log_queue)
+        writer.setFormatter(logging.Formatter("%(message)s %(path)s"))
+        producer = BoundedQueueHandler(log_queue)
+        for i in range(50):
+            producer.handle(_record(logging.INFO, f"request {i}", path="/"))
+
+        listener = QueueListener(log_queue, writer)
+        listener.start()
+        listener.stop()
+        writer.flush()
+
+        lines = stream.getvalue().splitlines()
+        assert lines == [f"request {i} /" for i in range(50)]
+        assert stream.writes < 5
+
+    def test_json_output_keeps_fields_and_extras(self):
+        log_queue: queue.Queue = queue.Queue()
+        stream = io.StringIO()
+        writer = BatchedStreamHandler(stream, log_queue)
+        writer.setFormatter(
+            JsonFormatter(
+                fmt="%(asctime)s %(levelname)s %(name)s %(message)s",
+                rename_fields={"asctime": "timestamp", "levelname": "level"},
+            )
+        )
+        producer = BoundedQueueHandler(log_queue)
+        producer.handle(_record(logging.INFO, "Request processed", status_code=200))
+        writer.handle(log_queue.get_nowait())
+
+        line = json.loads(stream.getvalue())
+        assert line["level"] == "INFO"
+        assert line["message"] == "Request processed"
+        assert line["status_code"] == 200
+        assert "timestamp" in line
@@ -0,0 +1,118 @@
+"""Tests for the /metrics endpoint and multiprocess aggregation."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app import app
+from exposition import MetricsExposition, get_metrics_exposition
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+WORKER = """
+import metrics
+metrics.http_requests_total.labels(method="GET", endpoint="/", status="200").inc()
+metrics.http_requests_in_progress.inc()
+"""
+
+SCRAPE = """
+from prometheus_client import generate_latest
+import metrics
+print(generate_latest(metrics.get_metrics_registry()).decode())
+"""
+
+
+def _run(code: str, metrics_dir: Path) -> str:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(metrics_dir)}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+class TestMetricsEndpoint:
+    def test_exposes_request_metrics(self, client):
+        client.get("/")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert 'http_requests_total{endpoint="/",method="GET",status="200"}' in (
+            response.text
+        )
+
+    def test_endpoint_label_is_route_template(self, client):
+        client.get("/health/")
+        client.get("/visits/history", params={"window": "5m"})
+        client.get("/wp-login.php")
+        text = client.get("/metrics").text
+        assert 'http_requests_total{endpoint="/health/",method="GET",status="200"}' in (
+            text
+        )
+        assert (
+            'http_requests_total{endpoint="/visits/history",method="GET",status="200"}'
+            in text
+        )
+        assert 'http_requests_total{endpoint="/other",method="GET",status="404"}' in (
+            text
+        )
+        assert "/wp-login.php" not in text
+
+    def test_negotiates_openmetrics(self, client):
+        response = client.get(
+            "/metrics", headers={"Accept": "application/openmetrics-text"}
+        )
+        assert response.headers["content-type"].startswith(
+            "application/openmetrics-text"
+        )
+        assert response.text.endswith("# EOF\n")
+
+    def test_logged_requests_leave_trace_exemplars(self, client):
+        client.get("/health/", headers={"X-Request-ID": "exemplar-check"})
+        response = client.get(
+            "/metrics", headers={"Accept": "application/openmetrics-text"}
+        )
+        assert '# {trace_id="exemplar-check"}' in response.text
+
+    def test_gzips_when_accepted(self, client):
+        response = client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "http_requests_total" in response.text
+
+        raw = client.get("/metrics", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in raw.headers
+
+    def test_reports_render_duration_and_size(self, client):
+        client.get("/metrics")
+        response = client.get("/metrics")
+        assert 'devops_info_metrics_render_seconds_count{format="text"}' in (
+            response.text
+        )
+        assert (
+            'devops_info_metrics_payload_bytes{encoding="identity",format="text"}'
+            in response.text
+        )
+
+    def test_rendering_is_cached_for_min_interval(self, client):
+        cached = MetricsExposition(min_interval_ms=60_000)
+        app.dependency_overrides[get_metrics_exposition] = lambda: cached
+        first = client.get("/metrics").content
+        client.get("/")
+        assert client.get("/metrics").content == first
+
+
+class TestMultiprocessMetrics:
+    def test_counters_add_up_and_dead_workers_are_reaped(self, tmp_path):
+        _run(WORKER, tmp_path)
+        _run(WORKER, tmp_path)
+
+        output = _run(SCRAPE, tmp_path)
+        assert (
+            'http_requests_total{endpoint="/",method="GET",status="200"} 2.0' in output
+        )
+        # Both workers have exited, so their in-progress requests are gone.
+        assert "http_requests_in_progress 0.0" in output
@@ -0,0 +1,153 @@
+"""Tests for the ASGI request instrumentation middleware."""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from middleware import AccessLogSampler, RequestLoggingMiddleware
+
+
+def _scope(path: str = "/") -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [],
+        "client": ("10.0.0.1", 1234),
+    }
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+class TestRequestLoggingMiddleware:
+    async def test_streaming_chunks_pass_through(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"a", "more_body": True})
+            await send({"type": "http.response.body", "body": b"b"})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await RequestLoggingMiddleware(app)(_scope(), _receive, send)
+        assert [m.get("body") for m in sent] == [None, b"a", b"b"]
+
+    async def test_logs_status_from_response_start(self, caplog):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        with caplog.at_level("INFO", logger="app.access"):
+            await RequestLoggingMiddleware(app)(_scope("/missing"), _receive, send)
+        record = caplog.records[-1]
+        assert record.status_code == 404
+        assert record.client_ip == "10.0.0.1"
+
+    async def test_exception_is_logged_and_reraised(self, caplog):
+        async def app(scope, receive, send):
+            raise RuntimeError("boom")
+
+        async def send(message):
+            pass
+
+        with caplog.at_level("ERROR", logger="app.access"), pytest.raises(RuntimeError):
+            await RequestLoggingMiddleware(app)(_scope(), _receive, send)
+        assert caplog.records[-1].error == "boom"
+
+    async def test_sampled_out_successes_still_log_errors(self, caplog):
+        async def app(scope, receive, send):
+            status = 500 if scope["path"] == "/fail" else 200
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        middleware = RequestLoggingMiddleware(app, lines_per_second=1)
+        middleware._sampler.rate = middleware._sampler._countdown = 1000
+        with caplog.at_level("INFO", logger="app.access"):
+            for _ in range(10):
+                await middleware(_scope(), _receive, send)
+            await middleware(_scope("/fail"), _receive, send)
+        assert [r.status_code for r in caplog.records] == [500]
+        assert caplog.records[0].sample_weight == 1
+
+    async def test_label_sets_are_capped(self):
+        async def app(scope, receive, send):
+            status = int(scope["path"].lstrip("/"))
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        labels = {"method": "OTHER", "endpoint": "/other", "status": "4xx"}
+        before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+        middleware = RequestLoggingMiddleware(app, max_label_sets=2)
+        for status in (200, 201, 404, 418, 200):
+            scope = _scope(f"/{status}")
+            scope["method"] = "BREW" if status == 418 else "GET"
+            await middleware(scope, _receive, send)
+        assert len(middleware._requests) == 3
+        assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 2
+
+
+class TestTraceId:
+    async def _run(self, headers, caplog):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = _scope()
+        scope["headers"] = headers
+        with caplog.at_level("INFO", logger="app.access"):
+            await RequestLoggingMiddleware(app)(scope, _receive, send)
+        response_headers = dict(sent[0]["headers"])
+        assert scope["state"]["trace_id"] == caplog.records[-1].trace_id
+        return caplog.records[-1].trace_id, response_headers[b"x-request-id"]
+
+    async def test_propagates_traceparent(self, caplog):
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        traceparent = f"00-{trace_id}-00f067aa0ba902b7-01".encode()
+        logged, echoed = await self._run([(b"traceparent", traceparent)], caplog)
+        assert logged == trace_id
+        assert echoed == trace_id.encode()
+
+    async def test_propagates_request_id(self, caplog):
+        logged, _ = await self._run([(b"x-request-id", b"req-42")], caplog)
+        assert logged == "req-42"
+
+    async def test_generates_id_for_missing_or_bogus_headers(self, caplog):
+        logged, _ = await self._run([(b"x-request-id", b"<script>")], caplog)
+        assert len(logged) == 32
+        assert set(logged) <= set("0123456789abcdef")
+
+
+class TestAccessLogSampler:
+    def test_keeps_everything_under_budget(self):
+        sampler = AccessLogSampler(lines_per_second=100)
+        assert [sampler.sample(now=0.0) for _ in range(5)] == [1] * 5
+
+    def test_rate_adapts_and_weights_add_up(self):
+        sampler = AccessLogSampler(lines_per_second=10)
+        now = sampler._window_start
+        weights = []
+        for second in range(5):
+            for i in range(1000):
+                weights.append(sampler.sample(now + second + i / 1000))
+        assert sampler.rate == 100
+        kept = [w for w in weights if w]
+        # After the first window, ~10 lines per second are kept.
+        assert len(kept[-40:]) == 40 and set(kept[-40:]) == {100}
+        assert abs(sum(kept) - len(weights)) <= sampler.rate
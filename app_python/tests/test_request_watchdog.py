@@ -0,0 +1,114 @@
+"""Tests for the slow-request stack capture watchdog."""
+
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+from starlette.concurrency import run_in_threadpool
+
+from middleware import RequestLoggingMiddleware
+from request_watchdog import SlowRequestWatchdog
+
+
+def _scope(path: str = "/slow") -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [],
+        "client": ("10.0.0.1", 1234),
+    }
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:
+    pass
+
+
+def _count(outcome: str) -> float:
+    labels = {"outcome": outcome}
+    return REGISTRY.get_sample_value("devops_info_slow_requests_total", labels) or 0
+
+
+async def _run(app, watchdog, caplog, path="/slow"):
+    watchdog.start()
+    try:
+        with caplog.at_level("WARNING", logger="app.watchdog"):
+            middleware = RequestLoggingMiddleware(app, watchdog=watchdog)
+            await middleware(_scope(path), _receive, _send)
+    finally:
+        watchdog.stop()
+    return [r for r in caplog.records if r.name == "app.watchdog"]
+
+
+def _functions(stack: list[str]) -> list[str]:
+    return [entry.rsplit(" ", 1)[1] for entry in stack]
+
+
+class TestSlowRequestWatchdog:
+    async def test_captures_blocked_event_loop(self, caplog):
+        async def app(scope, receive, send):
+            time.sleep(0.3)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        records = await _run(app, SlowRequestWatchdog(threshold_ms=50), caplog)
+        assert len(records) == 1
+        record = records[0]
+        assert (record.method, record.path) == ("GET", "/slow")
+        assert record.elapsed_ms >= 50
+        assert len(record.trace_id) == 32
+        assert "app" in _functions(record.stacks["event_loop"])
+
+    async def test_captures_worker_thread_serving_request(self, caplog):
+        def blocking_write():
+            time.sleep(0.3)
+
+        async def app(scope, receive, send):
+            await run_in_threadpool(blocking_write)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        records = await _run(app, SlowRequestWatchdog(threshold_ms=50), caplog)
+        stacks = records[0].stacks
+        workers = set(stacks) - {"event_loop", "task"}
+        assert len(workers) == 1
+        assert _functions(stacks[workers.pop()])[-1] == "blocking_write"
+        assert "app" in _functions(stacks["task"])
+
+    async def test_reports_are_rate_limited(self, caplog):
+        watchdog = SlowRequestWatchdog(threshold_ms=10, stacks_per_minute=1)
+        logged, suppressed = _count("logged"), _count("suppressed")
+        first = watchdog.begin("a" * 32, "GET", "/one")
+        second = watchdog.begin("b" * 32, "GET", "/two")
+        with caplog.at_level("WARNING", logger="app.watchdog"):
+            watchdog.check(now=first.started + 1)
+            watchdog.check(now=first.started + 2)
+        watchdog.end(first)
+        watchdog.end(second)
+        assert len(caplog.records) == 1
+        assert _count("logged") == logged + 1
+        assert _count("suppressed") == suppressed + 1
+
+    async def test_fast_requests_are_not_reported(self, caplog):
+        async def app(scope, receive, send):
+            await asyncio.sleep(0)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        watchdog = SlowRequestWatchdog(threshold_ms=1000)
+        assert await _run(app, watchdog, caplog) == []
+        assert watchdog._in_flight == {}
+
+    def test_zero_threshold_disables_tracking(self):
+        async def app(scope, receive, send):
+            pass
+
+        watchdog = SlowRequestWatchdog(threshold_ms=0)
+        middleware = RequestLoggingMiddleware(app, watchdog=watchdog)
+        assert middleware._watchdog is None
+        watchdog.start()
+        assert watchdog._thread is None
@@ -1,5 +1,9 @@
 """Tests for the root endpoint (GET /)."""
 
+from prometheus_client import REGISTRY
+
+from routes.root.models import APIInfoResponse
+
 
 class TestRootEndpoint:
     """Test suite for the root endpoint."""
@@ -122,3 +126,22 @@ class TestRootEndpoint:
         request_info = response.json()["request"]
 
         assert request_info["user_agent"] == custom_ua
+
+    def test_response_matches_api_info_model(self, client):
+        """Test that the spliced JSON body is a valid APIInfoResponse."""
+        response = client.get("/")
+        APIInfoResponse.model_validate_json(response.content)
+
+    def test_static_sections_served_from_snapshot(self, client):
+        """Test that static sections come from the startup snapshot."""
+        hits = REGISTRY.get_sample_value(
+            "devops_info_system_collection_seconds_count", {"snapshot": "hit"}
+        )
+        client.get("/")
+        client.get("/")
+        assert (
+            REGISTRY.get_sample_value(
+                "devops_info_system_collection_seconds_count", {"snapshot": "hit"}
+            )
+            == (hits or 0) + 2
+        )
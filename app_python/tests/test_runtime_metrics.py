@@ -0,0 +1,89 @@
+"""Tests for the runtime health collector."""
+
+import asyncio
+import gc
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from prometheus_client import REGISTRY
+
+from runtime_metrics import RuntimeCollector
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# GC firing while prometheus_client holds its multiprocess value lock.
+GC_UNDER_VALUE_LOCK = """
+import asyncio, gc
+import metrics
+from runtime_metrics import RuntimeCollector
+
+async def main():
+    collector = RuntimeCollector()
+    collector.start()
+    gc.set_threshold(1)
+    for i in range(200):
+        metrics.http_requests_total.labels(method="GET", endpoint=f"/{i}", status="200").inc()
+    gc.set_threshold(700)
+    await collector.stop()
+
+asyncio.run(main())
+"""
+
+
+def _sample(name: str, labels: dict | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+class TestRuntimeCollector:
+    async def test_blocked_loop_shows_up_as_lag(self):
+        collector = RuntimeCollector(interval_ms=10)
+        lag = _sample("devops_info_event_loop_lag_seconds_sum")
+        collector.start()
+        try:
+            await asyncio.sleep(0)
+            time.sleep(0.1)  # block the loop
+            await asyncio.sleep(0.05)
+        finally:
+            await collector.stop()
+        assert _sample("devops_info_event_loop_lag_seconds_sum") - lag >= 0.05
+
+    async def test_gc_pauses_are_timed_per_generation(self):
+        collector = RuntimeCollector()
+        labels = {"generation": "2"}
+        collections = _sample("devops_info_gc_pause_seconds_count", labels)
+        collector.start()
+        gc.collect()
+        await collector.stop()
+        gc.collect()
+        assert _sample("devops_info_gc_pause_seconds_count", labels) == collections + 1
+
+    async def test_samples_threadpool_and_fds(self):
+        collector = RuntimeCollector()
+        collector.start()
+        await collector.stop()
+        assert _sample("devops_info_threadpool_threads_capacity") == 40
+        assert _sample("devops_info_threadpool_threads_in_use") == 0
+        assert _sample("devops_info_open_fds") > 0
+
+    async def test_gc_callback_does_not_touch_metrics(self):
+        collector = RuntimeCollector()
+        labels = {"generation": "0"}
+        collections = _sample("devops_info_gc_pause_seconds_count", labels)
+        collector._on_gc("start", {"generation": 0})
+        collector._on_gc("stop", {"generation": 0})
+        assert _sample("devops_info_gc_pause_seconds_count", labels) == collections
+        collector._sample()
+        assert _sample("devops_info_gc_pause_seconds_count", labels) == collections + 1
+
+    def test_gc_during_multiprocess_value_creation_does_not_hang(self, tmp_path):
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        subprocess.run(
+            [sys.executable, "-c", GC_UNDER_VALUE_LOCK],
+            cwd=APP_DIR,
+            env=env,
+            check=True,
+            timeout=30,
+        )
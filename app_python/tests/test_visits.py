@@ -1,11 +1,31 @@
 """Tests for the /visits endpoint and counter persistence."""
 
+import os
+import time
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+from prometheus_client import REGISTRY
+from pydantic import ValidationError
+
+from config import Settings, settings
+from routes.visits.history import VisitsHistory
+from routes.visits.models import VisitsHistoryResponse, VisitsPoint
+from routes.visits.recorder import VisitsRecorder
+from routes.visits.service import VisitsCounter
+from routes.visits.sketches import HyperLogLog, TopK
+from routes.visits.snapshot import snapshot_shard
+from routes.visits.storage import FileStore
+from routes.visits.top import TopTalkers
+from routes.visits.unique import UniqueVisitors
+
 
 class TestVisitsEndpoint:
     def test_initial_count_is_zero(self, client):
         response = client.get("/visits/")
         assert response.status_code == 200
-        assert response.json() == {"visits": 0}
+        assert response.json() == {"visits": 0, "unique_visitors": 0}
 
     def test_root_increments_counter(self, client):
         client.get("/")
@@ -20,3 +40,329 @@ class TestVisitsEndpoint:
         client.get("/visits/")
         response = client.get("/visits/")
         assert response.json()["visits"] == 1
+
+
+class TestVisitsCounterDurability:
+    def test_interval_flushes_in_background(self, tmp_path):
+        counter = VisitsCounter(FileStore(tmp_path / "visits"), flush_interval_ms=10)
+        try:
+            counter.increment()
+            counter.increment()
+            deadline = time.monotonic() + 2
+            visits_file = tmp_path / "visits"
+            while not visits_file.exists() or visits_file.read_text() != "2":
+                assert time.monotonic() < deadline, "flusher never persisted"
+                time.sleep(0.01)
+        finally:
+            counter.close()
+
+    def test_interval_flushes_after_flush_every_increments(self, tmp_path):
+        counter = VisitsCounter(
+            FileStore(tmp_path / "visits"), flush_interval_ms=60_000, flush_every=3
+        )
+        try:
+            for _ in range(3):
+                counter.increment()
+            deadline = time.monotonic() + 2
+            while not (tmp_path / "visits").exists():
+                assert time.monotonic() < deadline, "flusher never woke up"
+                time.sleep(0.01)
+        finally:
+            counter.close()
+
+    def test_none_only_persists_on_close(self, tmp_path):
+        counter = VisitsCounter(FileStore(tmp_path / "visits"), durability="none")
+        counter.increment()
+        assert counter.get() == 1
+        assert not (tmp_path / "visits").exists()
+        counter.close()
+        assert (tmp_path / "visits").read_text() == "1"
+
+    def test_fsync_every_write_persists_immediately(self, tmp_path):
+        counter = VisitsCounter(
+            FileStore(tmp_path / "visits"), durability="fsync-every-write"
+        )
+        assert counter.increment() == 1
+        assert (tmp_path / "visits").read_text() == "1"
+        counter.close()
+
+    def test_value_survives_restart(self, tmp_path):
+        counter = VisitsCounter(FileStore(tmp_path / "visits"))
+        for _ in range(5):
+            counter.increment()
+        counter.close()
+
+        restarted = VisitsCounter(FileStore(tmp_path / "visits"))
+        assert restarted.get() == 5
+        restarted.close()
+
+
+class TestVisitsRecorder:
+    async def test_queued_increments_are_applied(self, tmp_path):
+        counter = VisitsCounter(FileStore(tmp_path / "visits"), durability="none")
+        recorder = VisitsRecorder(
+            counter, VisitsHistory(), UniqueVisitors(), TopTalkers(), mode="queued"
+        )
+        recorder.start()
+        for _ in range(50):
+            await recorder.record("127.0.0.1", "pytest")
+        recorder.close()
+        assert counter.get() == 50
+        counter.close()
+
+    async def test_drop_overflow_counts_dropped_increments(self, tmp_path):
+        counter = VisitsCounter(FileStore(tmp_path / "visits"), durability="none")
+        # Worker not started: the queue fills up and stays full.
+        recorder = VisitsRecorder(
+            counter,
+            VisitsHistory(),
+            UniqueVisitors(),
+            TopTalkers(),
+            queue_size=2,
+            overflow="drop",
+        )
+        dropped = REGISTRY.get_sample_value(
+            "devops_info_visits_increments_dropped_total"
+        )
+        for _ in range(5):
+            await recorder.record("127.0.0.1", "pytest")
+        assert (
+            REGISTRY.get_sample_value("devops_info_visits_increments_dropped_total")
+            == dropped + 3
+        )
+        recorder.start()
+        recorder.close()
+        assert counter.get() == 2
+        counter.close()
+
+    async def test_worker_survives_failing_statistics(self, tmp_path):
+        class BrokenTopTalkers(TopTalkers):
+            def add(self, user_agent: str, client_ip: str) -> None:
+                raise IndexError("boom")
+
+        counter = VisitsCounter(FileStore(tmp_path / "visits"), durability="none")
+        recorder = VisitsRecorder(
+            counter, VisitsHistory(), UniqueVisitors(), BrokenTopTalkers(), queue_size=1
+        )
+        recorder.start()
+        for _ in range(5):
+            await recorder.record("127.0.0.1", "pytest")
+        recorder.close()
+        assert counter.get() == 5
+        counter.close()
+
+
+class TestVisitsHistory:
+    def test_history_endpoint_counts_recent_visits(self, client):
+        client.get("/")
+        client.get("/")
+        response = client.get("/visits/history", params={"window": "5m"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["window_seconds"] == 300
+        assert data["step_seconds"] == 60
+        assert sum(point["visits"] for point in data["points"]) == 2
+
+    def test_history_timestamps_are_iso8601_utc(self, client):
+        response = client.get("/visits/history", params={"window": "2m"})
+        timestamp = response.json()["points"][0]["timestamp"]
+        assert timestamp.endswith("Z")
+        assert datetime.fromisoformat(timestamp).tzinfo == UTC
+
+    def test_orjson_and_stdlib_render_identically(self):
+        payload = VisitsHistoryResponse(
+            window_seconds=60,
+            step_seconds=60,
+            points=[VisitsPoint(timestamp=datetime.fromtimestamp(960, UTC), visits=4)],
+        ).model_dump(mode="json")
+        assert ORJSONResponse(payload).body == JSONResponse(payload).body
+
+    def test_history_rejects_unservable_window(self, client):
+        response = client.get("/visits/history", params={"window": "30d"})
+        assert response.status_code == 422
+
+    def test_history_rejects_malformed_duration(self, client):
+        response = client.get("/visits/history", params={"step": "1 minute"})
+        assert response.status_code == 422
+
+    def test_query_downsamples_and_expires_old_buckets(self):
+        history = VisitsHistory(seconds=60, minutes=10)
+        now = 6000.0
+        history.record(now - 5)
+        history.record(now - 5)
+        history.record(now - 65)
+        assert history.query(60, 10, now=now) == [
+            (start, 2 if start == 5990 else 0) for start in range(5950, 6010, 10)
+        ]
+        assert sum(visits for _, visits in history.query(600, 60, now=now)) == 3
+
+    def test_snapshot_survives_restart(self, tmp_path):
+        history = VisitsHistory(tmp_path / "visits.history", snapshot_interval_s=0)
+        history.record(1000.0, n=4)
+        history.close()
+
+        restored = VisitsHistory(tmp_path / "visits.history", snapshot_interval_s=0)
+        assert restored.query(60, 60, now=1000.0) == [(960, 4)]
+        assert [p.name for p in tmp_path.iterdir()] == ["visits.history"]
+
+    def test_sharded_writers_sum_and_fold_on_close(self, tmp_path):
+        path = tmp_path / "visits.history"
+        pod_0 = VisitsHistory(
+            path, snapshot_interval_s=0, shard="app-0", cache_ttl_ms=0
+        )
+        pod_1 = VisitsHistory(
+            path, snapshot_interval_s=0, shard="app-1", cache_ttl_ms=0
+        )
+        pod_0.record(1000.0, n=2)
+        pod_1.record(1000.0, n=3)
+        pod_0.close()
+        assert pod_1.query(60, 60, now=1000.0) == [(960, 5)]
+        pod_1.close()
+
+        renamed = VisitsHistory(path, snapshot_interval_s=0, shard="app-2")
+        assert renamed.query(60, 60, now=1000.0) == [(960, 5)]
+        renamed.close()
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "visits.history",
+            "visits.history.lock",
+        ]
+
+    def test_stale_peer_snapshots_are_folded_into_base(self, tmp_path):
+        path = tmp_path / "visits.history"
+        peer = VisitsHistory(seconds=60, minutes=10)
+        peer.record(1000.0, n=4)
+        for shard in ("gone", "live"):
+            path.with_name(f"visits.history.{shard}").write_bytes(peer._dump())
+        os.utime(path.with_name("visits.history.gone"), (0, 0))
+
+        history = VisitsHistory(
+            path, seconds=60, minutes=10, shard="app-0", cache_ttl_ms=0
+        )
+        assert history.query(60, 60, now=1000.0) == [(960, 8)]
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "visits.history",
+            "visits.history.live",
+            "visits.history.lock",
+        ]
+        assert history.query(60, 60, now=1000.0) == [(960, 8)]
+        history.close()
+
+    def test_snapshot_shard_is_per_pod_and_worker(self):
+        single = settings.model_copy(update={"pod_name": "app-0", "workers": 1})
+        multi = settings.model_copy(update={"pod_name": "app-0", "workers": 4})
+        assert snapshot_shard(single) == "app-0"
+        assert snapshot_shard(multi) == f"app-0-{os.getpid()}"
+
+
+class TestUniqueVisitors:
+    def test_visits_reports_unique_visitors(self, client):
+        client.get("/")
+        client.get("/")
+        response = client.get("/visits/")
+        assert response.json() == {"visits": 2, "unique_visitors": 1}
+
+    def test_estimate_is_close_for_many_clients(self):
+        unique = UniqueVisitors()
+        for i in range(20_000):
+            unique.add(f"10.{i // 65536}.{i // 256 % 256}.{i % 256}")
+            unique.add("10.0.0.1")
+        assert abs(unique.count() - 20_000) / 20_000 < 0.05
+
+    def test_sketch_survives_restart(self, tmp_path):
+        unique = UniqueVisitors(tmp_path / "visits.hll", snapshot_interval_s=0)
+        for i in range(100):
+            unique.add(f"192.168.0.{i}")
+        estimate = unique.count()
+        unique.close()
+
+        restored = UniqueVisitors(tmp_path / "visits.hll", snapshot_interval_s=0)
+        assert restored.count() == estimate
+
+    def test_count_merges_peer_snapshots(self, tmp_path):
+        base = tmp_path / "visits.hll"
+        pod_0 = UniqueVisitors(base, snapshot_interval_s=0, shard="app-0")
+        pod_1 = UniqueVisitors(base, snapshot_interval_s=0, shard="app-1")
+        for i in range(100):
+            pod_0.add(f"192.168.0.{i}")
+            pod_1.add(f"192.168.0.{i + 50}")
+        pod_1.close()
+        assert not (tmp_path / "visits.hll.app-1").exists()
+        assert abs(pod_0.count() - 150) <= 5
+        pod_0.close()
+
+        renamed = UniqueVisitors(base, snapshot_interval_s=0, shard="app-2")
+        assert abs(renamed.count() - 150) <= 5
+        renamed.close()
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "visits.hll",
+            "visits.hll.lock",
+        ]
+
+    def test_stale_peer_snapshots_are_folded_into_base(self, tmp_path):
+        base = tmp_path / "visits.hll"
+        for shard, offset in (("gone", 0), ("live", 50)):
+            peer = UniqueVisitors()
+            for i in range(100):
+                peer.add(f"192.168.0.{i + offset}")
+            base.with_name(f"visits.hll.{shard}").write_bytes(peer._dump())
+        os.utime(base.with_name("visits.hll.gone"), (0, 0))
+
+        unique = UniqueVisitors(base, shard="app-0", cache_ttl_ms=0)
+        assert abs(unique.count() - 150) <= 5
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "visits.hll",
+            "visits.hll.live",
+            "visits.hll.lock",
+        ]
+        assert abs(unique.count() - 150) <= 5
+        unique.close()
+
+    def test_corrupt_precision_is_rejected(self, tmp_path):
+        (tmp_path / "visits.hll").write_bytes(bytes([255]) + b"\x00" * 16)
+        with pytest.raises(ValueError):
+            HyperLogLog.load((tmp_path / "visits.hll").read_bytes())
+        unique = UniqueVisitors(tmp_path / "visits.hll", snapshot_interval_s=0)
+        assert unique.count() == 0
+
+
+class TestSettingsValidation:
+    def test_settings_reject_degenerate_sketches(self):
+        with pytest.raises(ValidationError):
+            Settings(visits_top_capacity=0)
+        with pytest.raises(ValidationError):
+            Settings(visits_hll_precision=19)
+
+    def test_several_workers_need_a_shared_store(self):
+        with pytest.raises(ValidationError, match="VISITS_STORAGE"):
+            Settings(workers=2, visits_storage="file")
+        assert Settings(workers=2, visits_storage="mmap").workers == 2
+
+    def test_topk_requires_capacity(self):
+        with pytest.raises(ValueError):
+            TopK(capacity=0)
+
+
+class TestTopTalkers:
+    def test_top_user_agents(self, client):
+        for _ in range(3):
+            client.get("/", headers={"User-Agent": "scanner/1.0"})
+        client.get("/", headers={"User-Agent": "curl/8.0"})
+        response = client.get("/visits/top", params={"by": "user_agent", "k": 1})
+        assert response.status_code == 200
+        assert response.json() == {
+            "by": "user_agent",
+            "entries": [{"value": "scanner/1.0", "count": 3}],
+        }
+
+    def test_top_rejects_unknown_dimension(self, client):
+        response = client.get("/visits/top", params={"by": "referer"})
+        assert response.status_code == 422
+
+    def test_heavy_hitters_survive_long_tail(self):
+        top_talkers = TopTalkers(capacity=10)
+        for i in range(5000):
+            top_talkers.add(f"bot-{i}", f"10.0.{i // 256}.{i % 256}")
+            if i % 10 == 0:
+                top_talkers.add("heavy", "10.9.9.9")
+        assert top_talkers.top("user_agent", 1)[0][0] == "heavy"
+        assert top_talkers.top("client_ip", 1)[0][0] == "10.9.9.9"
@@ -0,0 +1,234 @@
+"""Tests for the storage engines behind VisitsCounter."""
+
+import multiprocessing
+import socket
+import threading
+import time
+
+from routes.visits.service import VisitsCounter
+from routes.visits.storage import (
+    LogStore,
+    MmapStore,
+    RedisStore,
+    ShardedStore,
+    SQLiteStore,
+)
+from tests.fake_redis import FakeRedisServer
+
+
+def wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+class TestLogStore:
+    def test_rebuilds_total_from_log(self, tmp_path):
+        store = LogStore(tmp_path / "visits.log")
+        store.add(1)
+        store.add(4)
+        assert store.read() == 5
+        store.close()
+
+        reopened = LogStore(tmp_path / "visits.log")
+        assert reopened.read() == 5
+        reopened.close()
+
+    def test_torn_trailing_record_is_dropped(self, tmp_path):
+        store = LogStore(tmp_path / "visits.log")
+        store.add(3)
+        store.close()
+
+        segment = sorted((tmp_path / "visits.log").glob("*.log"))[-1]
+        with segment.open("ab") as f:
+            f.write(b"\x07\x00\x00")
+
+        reopened = LogStore(tmp_path / "visits.log")
+        assert reopened.read() == 3
+        assert reopened.add(1) == 4
+        reopened.close()
+
+    def test_compaction_folds_sealed_segments_into_snapshot(self, tmp_path):
+        directory = tmp_path / "visits.log"
+        store = LogStore(directory, segment_bytes=24)
+        for _ in range(10):
+            store.add(1)
+        wait_for(lambda: len(list(directory.glob("*.log"))) == 1)
+        assert (directory / "snapshot").exists()
+        store.close()
+
+        reopened = LogStore(directory, segment_bytes=24)
+        assert reopened.read() == 10
+        reopened.close()
+
+    def test_empty_log_is_seeded_from_legacy_file(self, tmp_path):
+        legacy = tmp_path / "visits"
+        legacy.write_text("12345")
+        store = LogStore(tmp_path / "visits.log", legacy_file=legacy)
+        assert store.read() == 12345
+        assert store.add(1) == 12346
+        store.close()
+
+        legacy.write_text("99")
+        reopened = LogStore(tmp_path / "visits.log", legacy_file=legacy)
+        assert reopened.read() == 12346
+        reopened.close()
+
+
+def _hammer_mmap(path, increments: int) -> None:
+    store = MmapStore(path)
+    for _ in range(increments):
+        store.add(1)
+    store.close()
+
+
+class TestMmapStore:
+    def test_add_and_reopen(self, tmp_path):
+        store = MmapStore(tmp_path / "visits.mmap")
+        assert store.add(2) == 2
+        assert store.read() == 2
+        store.close()
+
+        reopened = MmapStore(tmp_path / "visits.mmap")
+        assert reopened.read() == 2
+        reopened.close()
+
+    def test_new_slot_is_seeded_from_legacy_file(self, tmp_path):
+        legacy = tmp_path / "visits"
+        legacy.write_text("12345")
+        store = MmapStore(tmp_path / "visits.mmap", legacy_file=legacy)
+        assert store.add(1) == 12346
+        store.close()
+
+        legacy.write_text("99")
+        reopened = MmapStore(tmp_path / "visits.mmap", legacy_file=legacy)
+        assert reopened.read() == 12346
+        reopened.close()
+
+    def test_no_lost_updates_across_processes(self, tmp_path):
+        path = tmp_path / "visits.mmap"
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_hammer_mmap, args=(path, 500)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            assert worker.exitcode == 0
+
+        store = MmapStore(path)
+        assert store.read() == 2000
+        store.close()
+
+
+class TestShardedStore:
+    def test_read_sums_all_shards(self, tmp_path):
+        pod_0 = ShardedStore(tmp_path, shard="app-0", cache_ttl_ms=0)
+        pod_1 = ShardedStore(tmp_path, shard="app-1", cache_ttl_ms=0)
+        pod_0.add(2)
+        pod_1.add(3)
+        assert pod_0.read() == 5
+        assert pod_1.read() == 5
+        assert (tmp_path / "app-0.count").read_text() == "2"
+
+    def test_other_shards_are_cached(self, tmp_path):
+        pod_0 = ShardedStore(tmp_path, shard="app-0", cache_ttl_ms=60_000)
+        pod_1 = ShardedStore(tmp_path, shard="app-1", cache_ttl_ms=0)
+        assert pod_0.read() == 0
+        pod_1.add(3)
+        pod_0.add(1)
+        assert pod_0.read() == 1
+
+    def test_first_shard_imports_legacy_file(self, tmp_path):
+        legacy = tmp_path / "visits"
+        legacy.write_text("12345")
+        shards = tmp_path / "visits.shards"
+        pod_0 = ShardedStore(shards, shard="app-0", cache_ttl_ms=0, legacy_file=legacy)
+        assert pod_0.add(1) == 12346
+        pod_1 = ShardedStore(shards, shard="app-1", cache_ttl_ms=0, legacy_file=legacy)
+        assert pod_1.read() == 12346
+        assert sorted(p.name for p in shards.iterdir()) == [
+            "app-0.count",
+            "legacy.count",
+        ]
+
+
+def _hammer_sqlite(path, increments: int) -> None:
+    store = SQLiteStore(path, pool_size=1)
+    for _ in range(increments):
+        store.add(1)
+    store.close()
+
+
+class TestSQLiteStore:
+    def test_add_and_reopen(self, tmp_path):
+        store = SQLiteStore(tmp_path / "visits.sqlite3")
+        assert store.add(1) == 1
+        assert store.add(2) == 3
+        store.close()
+
+        reopened = SQLiteStore(tmp_path / "visits.sqlite3")
+        assert reopened.read() == 3
+        reopened.close()
+
+    def test_new_row_is_seeded_from_legacy_file(self, tmp_path):
+        legacy = tmp_path / "visits"
+        legacy.write_text("12345")
+        store = SQLiteStore(tmp_path / "visits.sqlite3", legacy_file=legacy)
+        assert store.add(1) == 12346
+        store.close()
+
+        legacy.write_text("99")
+        reopened = SQLiteStore(tmp_path / "visits.sqlite3", legacy_file=legacy)
+        assert reopened.read() == 12346
+        reopened.close()
+
+    def test_no_lost_updates_across_threads_and_processes(self, tmp_path):
+        path = tmp_path / "visits.sqlite3"
+        store = SQLiteStore(path, pool_size=2)
+        ctx = multiprocessing.get_context("fork")
+        workers = [
+            ctx.Process(target=_hammer_sqlite, args=(path, 100)) for _ in range(2)
+        ]
+        threads = [
+            threading.Thread(target=lambda: [store.add(1) for _ in range(100)])
+            for _ in range(4)
+        ]
+        for worker in [*workers, *threads]:
+            worker.start()
+        for worker in [*workers, *threads]:
+            worker.join()
+
+        assert store.read() == 600
+        store.close()
+
+
+class TestRedisStore:
+    def test_incrby_and_get(self):
+        with FakeRedisServer() as server:
+            store = RedisStore(server.url, key="visits")
+            assert store.read() == 0
+            assert store.add(3) == 3
+            assert store.read() == 3
+            assert server.data == {"visits": "3"}
+            store.close()
+
+    def test_counter_coalesces_increments_into_one_command(self):
+        with FakeRedisServer() as server:
+            counter = VisitsCounter(RedisStore(server.url), durability="none")
+            for _ in range(10):
+                counter.increment()
+            counter.close()
+            assert server.commands.count("INCRBY") == 1
+            assert server.data["visits"] == "10"
+
+    def test_unreachable_server_serves_last_known_total(self):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        store = RedisStore(f"redis://127.0.0.1:{port}/0", timeout=0.2)
+        counter = VisitsCounter(store, durability="none")
+        assert counter.get() == 0
+        store._last = 7
+        assert counter.get() == 7
+        store.close()
@@ -71,6 +71,10 @@ Common environment variables — DRY helper for reuse across deployments
   value: {{ .Chart.AppVersion | quote }}
 - name: RELEASE_NAME
   value: {{ .Release.Name }}
+- name: POD_NAME
+  valueFrom:
+    fieldRef:
+      fieldPath: metadata.name
 {{- range .Values.env }}
 - name: {{ .name }}
   value: {{ .value | quote }}